@@ -0,0 +1,164 @@
+import asyncio
+import heapq
+import itertools
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+
+from core.config import settings
+from db.pool import estimated_checkout_wait
+from db.session import engine
+from fastapi import status
+from logging_setup import setup_gunicorn_logging
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = setup_gunicorn_logging(__name__)
+
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+# lower goes first, exempt paths skip admission altogether
+READ_PRIORITY = 0
+WRITE_PRIORITY = 1
+
+
+@dataclass
+class AdmissionStats:
+    admitted: int = 0
+    # admitted after waiting in the queue
+    queued: int = 0
+    # shed requests by reason: queue_full, queue_timeout or pool_wait
+    shed: dict[str, int] = field(default_factory=dict)
+
+    def count_shed(self, reason: str) -> None:
+        self.shed[reason] = self.shed.get(reason, 0) + 1
+
+
+class AdmissionController:
+    """
+    Lets at most `max_concurrency` requests of this worker run at once. The next
+    ones wait in a queue of up to `max_queue` requests, reads before writes, for at
+    most `queue_timeout` seconds. Requests are refused right away when the queue is
+    full or when `pool_wait_estimate()` exceeds `max_pool_wait` seconds, as they
+    would only pile up on the exhausted connection pool.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        max_pool_wait: float,
+        pool_wait_estimate: Callable[[], float],
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.max_pool_wait = max_pool_wait
+        self.pool_wait_estimate = pool_wait_estimate
+        self.active = 0
+        self.stats = AdmissionStats()
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+
+    def status(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": len(self._waiters),
+            "admitted": self.stats.admitted,
+            "queued": self.stats.queued,
+            "shed": dict(self.stats.shed),
+        }
+
+    async def acquire(self, priority: int) -> Optional[str]:
+        """
+        :return: why the request was shed, None once it holds a slot
+        """
+        if 0 < self.max_pool_wait < self.pool_wait_estimate():
+            return "pool_wait"
+        if self.active < self.max_concurrency and not self._waiters:
+            self.active += 1
+            self.stats.admitted += 1
+            return None
+        if len(self._waiters) >= self.max_queue:
+            return "queue_full"
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = (priority, next(self._sequence), future)
+        heapq.heappush(self._waiters, waiter)
+        try:
+            await asyncio.wait_for(future, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as error:
+            if future.done() and not future.cancelled():
+                # the slot was handed over just as the wait ended
+                self.release()
+            else:
+                self._waiters.remove(waiter)
+                heapq.heapify(self._waiters)
+            if isinstance(error, asyncio.CancelledError):
+                raise
+            return "queue_timeout"
+        self.stats.admitted += 1
+        self.stats.queued += 1
+        return None
+
+    def release(self) -> None:
+        # the slot goes straight to the first waiter, `active` stays the same
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+
+class AdmissionMiddleware:
+    """
+    Answers 503 with Retry-After to the requests the controller sheds
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        controller: AdmissionController,
+        exempt_paths: set[str],
+        retry_after: int,
+    ):
+        self.app = app
+        self.controller = controller
+        self.exempt_paths = exempt_paths
+        self.retry_after = retry_after
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
+        priority = READ_PRIORITY if scope["method"] in READ_METHODS else WRITE_PRIORITY
+        reason = await self.controller.acquire(priority)
+        if reason is not None:
+            self.controller.stats.count_shed(reason)
+            logger.debug("Shed %s %s: %s", scope["method"], scope["path"], reason)
+            response = JSONResponse(
+                {"detail": "The server is overloaded, retry later"},
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(self.retry_after)},
+            )
+            await response(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
+
+
+admission_controller = (
+    AdmissionController(
+        max_concurrency=settings.ADMISSION_MAX_CONCURRENCY,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        queue_timeout=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        max_pool_wait=settings.ADMISSION_MAX_POOL_WAIT_SECONDS,
+        pool_wait_estimate=lambda: estimated_checkout_wait(engine),
+    )
+    if settings.ADMISSION_MAX_CONCURRENCY > 0
+    else None
+)
@@ -0,0 +1,98 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Annotated, Optional
+
+from core.config import settings
+from fastapi import Depends, Header, Response, status
+
+
+def make_etag(*parts) -> str:
+    """
+    Builds a weak entity tag out of the values that identify a representation
+    """
+    digest = hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def cache_control_header() -> str:
+    if settings.HTTP_CACHE_MAX_AGE <= 0:
+        # caches may store the response, but have to revalidate it every time
+        return "no-cache"
+    value = f"public, max-age={settings.HTTP_CACHE_MAX_AGE}"
+    if settings.HTTP_CACHE_STALE_WHILE_REVALIDATE > 0:
+        value += (
+            f", stale-while-revalidate={settings.HTTP_CACHE_STALE_WHILE_REVALIDATE}"
+        )
+    return value
+
+
+def _as_utc(value: datetime) -> datetime:
+    # timestamps are stored without a time zone, the database is expected to run in UTC
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value
+
+
+class ConditionalRequest:
+    """
+    Evaluates `If-None-Match` / `If-Modified-Since` and sets the validators and
+    `Cache-Control` headers of the response
+    """
+
+    def __init__(
+        self,
+        response: Response,
+        if_none_match: Annotated[Optional[str], Header()] = None,
+        if_modified_since: Annotated[Optional[str], Header()] = None,
+    ):
+        self.response = response
+        self.if_none_match = if_none_match
+        self.if_modified_since = if_modified_since
+
+    @property
+    def is_conditional(self) -> bool:
+        return self.if_none_match is not None or self.if_modified_since is not None
+
+    def is_not_modified(
+        self, etag: str, last_modified: Optional[datetime] = None
+    ) -> bool:
+        # If-None-Match takes precedence over If-Modified-Since, see RFC 9110 13.2.2
+        if self.if_none_match is not None:
+            tags = {
+                tag.strip().removeprefix("W/") for tag in self.if_none_match.split(",")
+            }
+            return "*" in tags or etag.removeprefix("W/") in tags
+
+        if self.if_modified_since is None or last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(self.if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        # HTTP dates have a resolution of one second
+        return _as_utc(last_modified).replace(microsecond=0) <= _as_utc(since)
+
+    def validator_headers(
+        self, etag: str, last_modified: Optional[datetime] = None
+    ) -> dict[str, str]:
+        headers = {"ETag": etag, "Cache-Control": cache_control_header()}
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(
+                _as_utc(last_modified), usegmt=True
+            )
+        return headers
+
+    def set_validators(self, etag: str, last_modified: Optional[datetime] = None):
+        self.response.headers.update(self.validator_headers(etag, last_modified))
+
+    def not_modified(
+        self, etag: str, last_modified: Optional[datetime] = None
+    ) -> Response:
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers=self.validator_headers(etag, last_modified),
+        )
+
+
+ConditionalDep = Annotated[ConditionalRequest, Depends(ConditionalRequest)]
@@ -1,20 +1,118 @@
-from typing import Annotated, Any, AsyncGenerator
+import math
+import time
+from typing import (
+    Annotated,
+    Any,
+    AsyncContextManager,
+    AsyncGenerator,
+    Callable,
+    Union,
+)
 
-from db.session import async_session
-from fastapi import Depends
+from core.config import DbSessionScopeEnum, settings
+from db.connections import OperationConnection
+from db.session import async_session, engine, replica_router
+from fastapi import Depends, Request, Response
 from logging_setup import setup_gunicorn_logging
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
 
 logger = setup_gunicorn_logging(__name__)
 
+# holds the unix time until which the client reads from the primary
+READ_YOUR_WRITES_COOKIE = "db_read_primary_until"
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
-async def get_db_session() -> AsyncGenerator[Any, Any]:
+
+async def get_db_session(
+    request: Request, response: Response
+) -> AsyncGenerator[Any, Any]:
     """
     Dependency function that yields db sessions
     """
+    if replica_router and request.method not in SAFE_METHODS:
+        # the replicas may not have this write yet, keep the client's reads on
+        # the primary for a while
+        read_primary_until = time.time() + settings.DB_READ_YOUR_WRITES_SECONDS
+        response.set_cookie(
+            READ_YOUR_WRITES_COOKIE,
+            f"{read_primary_until:.3f}",
+            max_age=math.ceil(settings.DB_READ_YOUR_WRITES_SECONDS),
+            httponly=True,
+            samesite="lax",
+        )
     logger.info("Creating new db session")
     async with async_session() as session:
         yield session
 
 
 DbSessionDep = Annotated[AsyncSession, Depends(get_db_session)]
+
+
+def reads_from_primary(request: Request) -> bool:
+    try:
+        return float(request.cookies.get(READ_YOUR_WRITES_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+async def read_engine(request: Request) -> AsyncEngine:
+    """
+    The engine reads of this request go to: a replica unless none is configured
+    or up to date, or the client wrote something moments ago
+    """
+    if replica_router and not reads_from_primary(request):
+        replica = await replica_router.get_engine()
+        if replica is not None:
+            return replica
+    return engine
+
+
+async def get_read_db_session(request: Request) -> AsyncGenerator[Any, Any]:
+    """
+    Dependency function that yields db sessions for read-only endpoints
+    """
+    logger.info("Creating new read db session")
+    async with async_session(bind=await read_engine(request)) as session:
+        yield session
+
+
+ReadDbSessionDep = Annotated[AsyncSession, Depends(get_read_db_session)]
+
+
+async def get_read_db_connection(request: Request) -> AsyncGenerator[Any, Any]:
+    """
+    Dependency function that yields Core connections for read-only endpoints,
+    BaseCrud reads run on these without setting up an ORM session.
+    When `DB_SESSION_SCOPE` is "operation" the connection is only checked out
+    while each BaseCrud read runs, see `OperationConnection`.
+    """
+    bind = await read_engine(request)
+    if settings.DB_SESSION_SCOPE == DbSessionScopeEnum.OPERATION:
+        logger.info("Creating new per-operation read db connection")
+        connection = OperationConnection(bind)
+        try:
+            yield connection
+        finally:
+            await connection.release()
+        return
+    logger.info("Creating new read db connection")
+    async with bind.connect() as connection:
+        yield connection
+
+
+ReadDbConnectionDep = Annotated[
+    Union[AsyncConnection, OperationConnection], Depends(get_read_db_connection)
+]
+
+
+def get_db_session_factory() -> Callable[[], AsyncContextManager[AsyncSession]]:
+    """
+    Dependency function for responses that outlive the endpoint function
+    (e.g. streaming ones), these have to open and close their own db session
+    """
+    return async_session
+
+
+DbSessionFactoryDep = Annotated[
+    Callable[[], AsyncContextManager[AsyncSession]], Depends(get_db_session_factory)
+]
@@ -1,10 +1,15 @@
-from typing import Annotated
+from typing import Annotated, Optional
 
-from fastapi import Depends
+from core.config import settings
+from fastapi import Depends, Query
 
 
 class LimitOffsetPaginationParams:
-    def __init__(self, limit: int = 20, offset: int = 0):
+    def __init__(
+        self,
+        limit: Annotated[int, Query(ge=1, le=settings.PAGINATION_MAX_LIMIT)] = 20,
+        offset: Annotated[int, Query(ge=0)] = 0,
+    ):
         self.limit = limit
         self.offset = offset
 
@@ -12,3 +17,12 @@ class LimitOffsetPaginationParams:
 PaginationDep = Annotated[
     LimitOffsetPaginationParams, Depends(LimitOffsetPaginationParams)
 ]
+
+CursorDep = Annotated[
+    Optional[str],
+    Query(
+        description="Switches to keyset pagination: pass an empty value to get the "
+        "first page, then the `next_cursor` of the previous page. "
+        "`offset` is ignored in this mode.",
+    ),
+]
@@ -0,0 +1,54 @@
+from api.admission import admission_controller
+from api.dependencies.docs_security import basic_http_credentials
+from db.crud.cache import crud_cache
+from db.crud.single_flight import single_flight
+from db.crud.statements import compiled_cache_stats, statement_cache_stats
+from db.pool import pools_status
+from db.session import named_engines
+from fastapi import APIRouter, Depends
+
+router = APIRouter(
+    prefix="/diagnostics",
+    include_in_schema=False,
+    dependencies=[Depends(basic_http_credentials)],
+)
+
+
+@router.get("/cache")
+async def cache_stats() -> dict:
+    if crud_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **crud_cache.stats.as_dict()}
+
+
+@router.get("/single-flight")
+async def single_flight_stats() -> dict:
+    if single_flight is None:
+        return {"enabled": False}
+    return {
+        "enabled": True,
+        "in_flight": len(single_flight),
+        **single_flight.stats.as_dict(),
+    }
+
+
+@router.get("/admission")
+async def admission_stats() -> dict:
+    if admission_controller is None:
+        return {"enabled": False}
+    return {"enabled": True, **admission_controller.status()}
+
+
+@router.get("/pool")
+async def pool_stats() -> dict:
+    return pools_status(named_engines())
+
+
+@router.get("/statements")
+async def statement_stats() -> dict:
+    return {
+        "compiled_cache": compiled_cache_stats.as_dict(),
+        "crud_statements": {
+            name: stats.as_dict() for name, stats in statement_cache_stats.items()
+        },
+    }
@@ -0,0 +1,11 @@
+from fastapi.responses import JSONResponse
+
+
+class RawJSONResponse(JSONResponse):
+    """
+    JSON response for bodies that are encoded already, e.g. by
+    `BaseCrud.get_paginated_list_json`
+    """
+
+    def render(self, content: bytes) -> bytes:
+        return content
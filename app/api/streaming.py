@@ -0,0 +1,32 @@
+import csv
+import io
+from typing import AsyncIterator, Type
+
+from pydantic import BaseModel
+from schemas.base import RecordFormat
+
+
+async def encode_batches(
+    batches: AsyncIterator[list[BaseModel]],
+    export_format: RecordFormat,
+    schema: Type[BaseModel],
+) -> AsyncIterator[str]:
+    """
+    Encodes batches of schema instances, one response chunk per batch
+    """
+    if export_format == RecordFormat.NDJSON:
+        async for batch in batches:
+            yield "".join(f"{item.model_dump_json()}\n" for item in batch)
+        return
+
+    fields = list(schema.model_fields.keys())
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    # send the header right away, even when the first batch is slow to come
+    yield buffer.getvalue()
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(item.model_dump(mode="json") for item in batch)
+        yield buffer.getvalue()
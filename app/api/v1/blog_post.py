@@ -1,13 +1,31 @@
-from api.dependencies.database import DbSessionDep
-from api.dependencies.pagination import PaginationDep
+from typing import Annotated, Optional
+
+from api.dependencies.conditional import ConditionalDep, make_etag
+from api.dependencies.database import (
+    DbSessionDep,
+    DbSessionFactoryDep,
+    ReadDbConnectionDep,
+    ReadDbSessionDep,
+)
+from api.dependencies.pagination import CursorDep, PaginationDep
+from api.responses import RawJSONResponse
+from api.streaming import encode_batches
+from core.config import settings
+from db.copy_import import copy_import
+from db.crud.batching import insert_batcher_of
 from db.crud.blog_post import BlogPostCrud
-from fastapi import APIRouter, Response, status
+from db.crud.count import CountStrategy
+from fastapi import APIRouter, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from logging_setup import setup_gunicorn_logging
+from observability.timing import TimedRoute
 from schemas import blog_post as blog_post_schemas
+from schemas.base import ImportReportSchema, RecordFormat
 
 router = APIRouter(
     prefix="/blog",
     tags=["Blog posts"],
+    route_class=TimedRoute,
 )
 
 logger = setup_gunicorn_logging(__name__)
@@ -17,22 +35,180 @@ logger = setup_gunicorn_logging(__name__)
 async def create_a_blog_post(
     blog_post: blog_post_schemas.InBlogPostSchema,
     db: DbSessionDep,
+    session_factory: DbSessionFactoryDep,
 ):
     logger.info("inside 'create_a_blog_post'")
+    if settings.CRUD_INSERT_BATCHING_ENABLED:
+        # inserted and committed together with concurrent creates
+        return await insert_batcher_of(BlogPostCrud).create(blog_post, session_factory)
     crud = BlogPostCrud(db)
     result = await crud.create(blog_post)
     await crud.commit_session()
     return result
 
 
+@router.post(
+    "/bulk", status_code=201, response_model=blog_post_schemas.BulkBlogPostResultSchema
+)
+async def bulk_create_blog_posts(
+    bulk: blog_post_schemas.BulkCreateBlogPostSchema,
+    db: DbSessionDep,
+):
+    logger.info("inside 'bulk_create_blog_posts'")
+    crud = BlogPostCrud(db)
+    created = await crud.bulk_create(bulk.items)
+    await crud.commit_session()
+    return blog_post_schemas.BulkBlogPostResultSchema(
+        items=[{"id": item.id, "status": 201, "item": item} for item in created]
+    )
+
+
+@router.patch("/bulk", response_model=blog_post_schemas.BulkBlogPostResultSchema)
+async def bulk_update_blog_posts(
+    bulk: blog_post_schemas.BulkUpdateBlogPostSchema,
+    db: DbSessionDep,
+):
+    logger.info("inside 'bulk_update_blog_posts'")
+    crud = BlogPostCrud(db)
+    updated = await crud.bulk_update(
+        {
+            item.id: blog_post_schemas.UpdateBlogPostSchema(
+                **item.model_dump(exclude={"id"}, exclude_unset=True)
+            )
+            for item in bulk.items
+        }
+    )
+    await crud.commit_session()
+    return blog_post_schemas.BulkBlogPostResultSchema(
+        items=[
+            (
+                {"id": item.id, "status": 200, "item": updated[item.id]}
+                if updated[item.id] is not None
+                else {"id": item.id, "status": 404, "detail": "Object not found"}
+            )
+            for item in bulk.items
+        ]
+    )
+
+
+@router.delete("/bulk", response_model=blog_post_schemas.BulkBlogPostResultSchema)
+async def bulk_delete_blog_posts(
+    bulk: blog_post_schemas.BulkDeleteBlogPostSchema,
+    db: DbSessionDep,
+):
+    logger.info("inside 'bulk_delete_blog_posts'")
+    crud = BlogPostCrud(db)
+    deleted = await crud.bulk_delete(bulk.ids)
+    await crud.commit_session()
+    return blog_post_schemas.BulkBlogPostResultSchema(
+        items=[
+            (
+                {"id": post_id, "status": 204}
+                if post_id in deleted
+                else {"id": post_id, "status": 404, "detail": "Object not found"}
+            )
+            for post_id in bulk.ids
+        ]
+    )
+
+
+@router.post("/import", response_model=ImportReportSchema)
+async def import_blog_posts(
+    request: Request,
+    db: DbSessionDep,
+    import_format: Annotated[RecordFormat, Query(alias="format")] = RecordFormat.NDJSON,
+):
+    """
+    Loads posts from an NDJSON or CSV request body with COPY, in batched commits.
+    Invalid records are skipped and listed in the report.
+    """
+    logger.info("inside 'import_blog_posts'")
+    crud = BlogPostCrud(db)
+    return await copy_import(
+        crud, blog_post_schemas.InBlogPostSchema, request.stream(), import_format
+    )
+
+
 @router.get("", response_model=blog_post_schemas.PaginatedBlogPostSchema)
 async def list_blog_posts(
-    db: DbSessionDep,
+    db: ReadDbConnectionDep,
     pagination: PaginationDep,
+    conditional: ConditionalDep,
+    cursor: CursorDep = None,
+    count: Optional[CountStrategy] = None,
 ):
     logger.info("inside 'list_blog_posts'")
     crud = BlogPostCrud(db)
-    return await crud.get_paginated_list(pagination.limit, pagination.offset)
+    if settings.CRUD_FAST_SERIALIZATION:
+        body = await crud.get_paginated_list_json(
+            pagination.limit, pagination.offset, cursor=cursor, count_strategy=count
+        )
+        etag = make_etag(body)
+        if conditional.is_not_modified(etag):
+            return conditional.not_modified(etag)
+        return RawJSONResponse(body, headers=conditional.validator_headers(etag))
+
+    page = await crud.get_paginated_list(
+        pagination.limit, pagination.offset, cursor=cursor, count_strategy=count
+    )
+    # updated_at changes with every write, so it stands in for the item contents.
+    # No Last-Modified here: it would not change when an item leaves the page.
+    etag = make_etag(
+        page.total,
+        page.next_cursor,
+        *((item.id, item.updated_at) for item in page.items),
+    )
+    if conditional.is_not_modified(etag):
+        return conditional.not_modified(etag)
+    conditional.set_validators(etag)
+    return page
+
+
+@router.get("/search", response_model=blog_post_schemas.PaginatedBlogPostSchema)
+async def search_blog_posts(
+    db: ReadDbSessionDep,
+    q: Annotated[str, Query(min_length=1, max_length=256)],
+    limit: Annotated[int, Query(ge=1, le=settings.PAGINATION_MAX_LIMIT)] = 20,
+    cursor: Optional[str] = None,
+):
+    """
+    Full-text search over titles and bodies, best matches first.
+    Pass the `next_cursor` of a page to get the next one, `total` is always null.
+    """
+    logger.info("inside 'search_blog_posts'")
+    crud = BlogPostCrud(db)
+    return await crud.search(q, limit, cursor or "")
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}, "text/csv": {}},
+            "description": "All blog posts, streamed",
+        },
+    },
+)
+async def export_blog_posts(
+    session_factory: DbSessionFactoryDep,
+    export_format: Annotated[RecordFormat, Query(alias="format")] = RecordFormat.NDJSON,
+):
+    logger.info("inside 'export_blog_posts'")
+
+    async def batches():
+        # the request's session is closed before the response body is sent
+        async with session_factory() as session:
+            crud = BlogPostCrud(session)
+            async for batch in crud.stream_all(batch_size=settings.EXPORT_BATCH_SIZE):
+                yield batch
+
+    filename = f"blog_posts.{export_format.value}"
+    return StreamingResponse(
+        encode_batches(batches(), export_format, blog_post_schemas.OutBlogPostSchema),
+        media_type=export_format.media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
 
 
 @router.get(
@@ -46,11 +222,21 @@ async def list_blog_posts(
 )
 async def retrieve_a_blog_post(
     post_id: int,
-    db: DbSessionDep,
+    db: ReadDbConnectionDep,
+    conditional: ConditionalDep,
 ):
     logger.info("inside 'retrieve_a_blog_post'")
     crud = BlogPostCrud(db)
-    return await crud.get_by_id(post_id)
+    if conditional.is_conditional:
+        # answer revalidations from the version alone, without fetching the body
+        updated_at = await crud.get_version_by_id(post_id)
+        etag = make_etag(post_id, updated_at)
+        if conditional.is_not_modified(etag, updated_at):
+            return conditional.not_modified(etag, updated_at)
+
+    result = await crud.get_by_id(post_id)
+    conditional.set_validators(make_etag(post_id, result.updated_at), result.updated_at)
+    return result
 
 
 @router.patch(
@@ -69,8 +255,7 @@ async def update_a_blog_post(
 ):
     logger.info("inside update_a_blog_post")
     crud = BlogPostCrud(db)
-    await crud.update_by_id(post_id, blog_post)
-    result = await crud.get_by_id(post_id)
+    result = await crud.update_and_get_by_id(post_id, blog_post)
     await crud.commit_session()
     return result
 
@@ -1,7 +1,7 @@
 import os
 from enum import Enum
 from functools import lru_cache
-from typing import Optional, Set
+from typing import Dict, List, Optional, Set
 
 from pydantic import PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -14,6 +14,16 @@ class EnvironmentEnum(str, Enum):
     TEST = "test"
 
 
+class ReplicaStrategyEnum(str, Enum):
+    ROUND_ROBIN = "round_robin"
+    LEAST_BUSY = "least_busy"
+
+
+class DbSessionScopeEnum(str, Enum):
+    REQUEST = "request"
+    OPERATION = "operation"
+
+
 class GlobalSettings(BaseSettings):
     PROJECT_NAME: str = "FastAPI Template"
 
@@ -30,6 +40,121 @@ class GlobalSettings(BaseSettings):
     )
     DB_ECHO_LOG: bool = False
 
+    # per engine and per worker, so the primary can get up to
+    # PROCESS_WORKERS * (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = False
+    DB_POOL_USE_LIFO: bool = False
+    # compiled forms of statements kept per engine
+    DB_QUERY_CACHE_SIZE: int = 500
+
+    # "request" keeps the connection of a read endpoint until the session is closed,
+    # after the response has been serialized; "operation" hands it back to the pool
+    # as soon as each BaseCrud read is done
+    DB_SESSION_SCOPE: DbSessionScopeEnum = DbSessionScopeEnum.REQUEST
+    # the server closes connections left idle in a transaction for longer, 0 disables
+    DB_IDLE_IN_TRANSACTION_TIMEOUT_MS: int = 10_000
+
+    # read-only endpoints are routed to these when set, writes always go to
+    # DATABASE_URL; a replica lagging more than DB_REPLICA_MAX_LAG_SECONDS is
+    # skipped, as is one whose lag probe takes longer than
+    # DB_REPLICA_PROBE_TIMEOUT_SECONDS, and a client reads from the primary for
+    # DB_READ_YOUR_WRITES_SECONDS after a write
+    DATABASE_REPLICA_URLS: List[PostgresDsn] = []
+    DB_REPLICA_STRATEGY: ReplicaStrategyEnum = ReplicaStrategyEnum.ROUND_ROBIN
+    DB_REPLICA_MAX_LAG_SECONDS: float = 5.0
+    DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 1.0
+    DB_REPLICA_PROBE_TIMEOUT_SECONDS: float = 0.5
+    DB_READ_YOUR_WRITES_SECONDS: float = 5.0
+
+    # statements slower than this are logged with their fingerprint, 0 disables. With
+    # DB_QUERY_COUNT_HEADER responses tell how many statements they took, and how long
+    DB_SLOW_QUERY_MS: float = 200.0
+    DB_QUERY_COUNT_HEADER: bool = False
+
+    # run by every worker before it serves requests: opens pool connections, builds
+    # the CRUD statements and the OpenAPI schema, then GETs each of WARMUP_REQUESTS
+    # (e.g. '["/v1/blog?limit=1"]')
+    WARMUP_ENABLED: bool = True
+    WARMUP_POOL_CONNECTIONS: int = 1
+    WARMUP_REQUESTS: List[str] = []
+
+    PAGINATION_MAX_LIMIT: int = 100
+    BULK_MAX_ITEMS: int = 1000
+    EXPORT_BATCH_SIZE: int = 1000
+    IMPORT_CHUNK_SIZE: int = 5000
+    IMPORT_MAX_REPORTED_ERRORS: int = 100
+    COUNT_CACHE_TTL_SECONDS: float = 30.0
+    # list endpoints encode pages to JSON straight from the rows, skipping the
+    # per-item model validation and FastAPI's response_model pass
+    CRUD_FAST_SERIALIZATION: bool = False
+
+    # per-worker read-through cache of BaseCrud reads, other workers only see
+    # writes once their entries expire
+    CRUD_CACHE_ENABLED: bool = False
+    CRUD_CACHE_MAX_ENTRIES: int = 10_000
+    CRUD_CACHE_TTL_SECONDS: float = 5.0
+
+    # POST /v1/blog inserts the posts of concurrent requests together, waiting up to
+    # CRUD_INSERT_BATCH_WINDOW_MS for CRUD_INSERT_BATCH_MAX_ROWS rows: fewer, larger
+    # transactions at the cost of up to the window in added latency
+    CRUD_INSERT_BATCHING_ENABLED: bool = False
+    CRUD_INSERT_BATCH_WINDOW_MS: float = 2.0
+    CRUD_INSERT_BATCH_MAX_ROWS: int = 100
+
+    # rows soft-deleted more than PURGE_RETENTION_DAYS ago are deleted for good by
+    # `python purge_deleted.py`, or every PURGE_INTERVAL_SECONDS by one of the workers
+    # with PURGE_ENABLED. Batches of PURGE_BATCH_SIZE rows, PURGE_BATCH_PAUSE_SECONDS
+    # apart, for at most PURGE_MAX_SECONDS per table (0 means no limit)
+    PURGE_ENABLED: bool = False
+    PURGE_RETENTION_DAYS: float = 30.0
+    PURGE_INTERVAL_SECONDS: float = 3600.0
+    PURGE_BATCH_SIZE: int = 1000
+    PURGE_BATCH_PAUSE_SECONDS: float = 0.1
+    PURGE_MAX_SECONDS: float = 0
+
+    # identical BaseCrud reads in flight at the same time in a worker share one query
+    CRUD_SINGLE_FLIGHT_ENABLED: bool = False
+
+    # with LOG_QUEUE_ENABLED app log records are formatted and written by a background
+    # thread. Sample rates and rate limits (records per second) are set per logger
+    # name, e.g. LOG_SAMPLE_RATES='{"api.v1.blog_post": 0.01}', and only apply below
+    # WARNING
+    LOG_QUEUE_ENABLED: bool = False
+    LOG_SAMPLE_RATES: Dict[str, float] = {}
+    LOG_RATE_LIMITS: Dict[str, float] = {}
+
+    # per worker, 0 disables admission control. Requests above
+    # ADMISSION_MAX_CONCURRENCY wait in a queue, reads first, and get a 503 with
+    # Retry-After when the queue is full, after ADMISSION_QUEUE_TIMEOUT_SECONDS, or
+    # right away while the primary pool is exhausted and its recent checkouts waited
+    # longer than ADMISSION_MAX_POOL_WAIT_SECONDS (0 disables that check)
+    ADMISSION_MAX_CONCURRENCY: int = 0
+    ADMISSION_MAX_QUEUE: int = 100
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 5.0
+    ADMISSION_MAX_POOL_WAIT_SECONDS: float = 1.0
+    ADMISSION_RETRY_AFTER_SECONDS: int = 1
+    ADMISSION_EXEMPT_PATHS: Set[str] = {"/health", "/metrics"}
+
+    # Server-Timing header of each response: db, validate, deps, serialize and total,
+    # up to the start of the response. SERVER_TIMING_LOG also logs it per request
+    SERVER_TIMING_ENABLED: bool = False
+    SERVER_TIMING_LOG: bool = False
+
+    # served on /metrics behind the docs credentials. Under Gunicorn set the
+    # PROMETHEUS_MULTIPROC_DIR environment variable (read by prometheus_client, not
+    # here), so any worker can report the totals of all of them. Pool and admission
+    # numbers are then sampled every METRICS_SAMPLE_INTERVAL_SECONDS per worker
+    METRICS_ENABLED: bool = True
+    METRICS_SAMPLE_INTERVAL_SECONDS: float = 5.0
+
+    # Cache-Control of the read endpoints, 0 means "no-cache" (always revalidate)
+    HTTP_CACHE_MAX_AGE: int = 0
+    HTTP_CACHE_STALE_WHILE_REVALIDATE: int = 0
+
     model_config = SettingsConfigDict(
         extra="allow",
         env_file=".env",
@@ -42,11 +167,15 @@ class GlobalSettings(BaseSettings):
 
 class TestSettings(GlobalSettings):
     DEBUG: bool = True
+    DB_QUERY_COUNT_HEADER: bool = True
+    SERVER_TIMING_ENABLED: bool = True
     ENVIRONMENT: EnvironmentEnum = EnvironmentEnum.TEST
 
 
 class DevelopSettings(GlobalSettings):
     DEBUG: bool = True
+    DB_QUERY_COUNT_HEADER: bool = True
+    SERVER_TIMING_ENABLED: bool = True
     ENVIRONMENT: EnvironmentEnum = EnvironmentEnum.DEVELOP
 
 
@@ -0,0 +1,34 @@
+from typing import Any, Optional
+
+from sqlalchemy.engine import Result
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncResult
+
+
+class OperationConnection:
+    """
+    Stands in for a Core `AsyncConnection` that is only checked out of `engine`
+    while a read runs: the first statement connects, and `release` (which BaseCrud
+    calls once each read is done) hands the connection back to the pool. The next
+    read checks out a connection again.
+    """
+
+    def __init__(self, engine: AsyncEngine) -> None:
+        self.engine = engine
+        self.info: dict = {}
+        self._connection: Optional[AsyncConnection] = None
+
+    async def _connect(self) -> AsyncConnection:
+        if self._connection is None:
+            self._connection = await self.engine.connect()
+        return self._connection
+
+    async def execute(self, *args: Any, **kwargs: Any) -> Result:
+        return await (await self._connect()).execute(*args, **kwargs)
+
+    async def stream(self, *args: Any, **kwargs: Any) -> AsyncResult:
+        return await (await self._connect()).stream(*args, **kwargs)
+
+    async def release(self) -> None:
+        if self._connection is not None:
+            connection, self._connection = self._connection, None
+            await connection.close()
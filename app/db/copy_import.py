@@ -0,0 +1,132 @@
+import codecs
+import csv
+import json
+import time
+from typing import Any, AsyncIterator, Optional, Type
+
+import psycopg
+from core.config import settings
+from db.crud.base import BaseCrud
+from logging_setup import setup_gunicorn_logging
+from pydantic import BaseModel, ValidationError
+from schemas.base import ImportErrorSchema, ImportReportSchema, RecordFormat
+from sqlalchemy.exc import DBAPIError
+
+logger = setup_gunicorn_logging(__name__)
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """
+    Splits a stream of UTF-8 encoded chunks into lines, keeping the line breaks
+    """
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split("\n")
+        for line in lines:
+            yield line + "\n"
+    pending += decoder.decode(b"", final=True)
+    if pending:
+        yield pending
+
+
+async def parse_ndjson(lines: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """
+    Yields one decoded object per non-blank line, or the exception raised decoding it
+    """
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            yield json.loads(line)
+        except ValueError as e:
+            yield e
+
+
+async def parse_csv(lines: AsyncIterator[str]) -> AsyncIterator[Any]:
+    """
+    Yields one dict per record, keyed by the header row.
+    A record continues on the next line while it has an unbalanced quote.
+    """
+    header: Optional[list[str]] = None
+    record = ""
+    async for line in lines:
+        record += line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+        try:
+            values = next(csv.reader([text]))
+        except csv.Error as e:
+            yield e
+            continue
+        if header is None:
+            header = values
+        elif len(values) != len(header):
+            yield ValueError(f"expected {len(header)} fields, got {len(values)}")
+        else:
+            yield dict(zip(header, values))
+    if record.strip():
+        yield ValueError("unterminated quoted field")
+
+
+async def copy_import(
+    crud: BaseCrud,
+    in_schema: Type[BaseModel],
+    chunks: AsyncIterator[bytes],
+    record_format: RecordFormat,
+    chunk_size: Optional[int] = None,
+) -> ImportReportSchema:
+    """
+    Validates the records of `chunks` against `in_schema` and writes them with
+    COPY, committing every `chunk_size` valid records. Invalid records and chunks
+    the database refuses are reported instead of aborting the load.
+    """
+    chunk_size = chunk_size or settings.IMPORT_CHUNK_SIZE
+    parse = parse_csv if record_format == RecordFormat.CSV else parse_ndjson
+    report = ImportReportSchema()
+    started_at = time.perf_counter()
+
+    def reject(record: int, error: str, count: int = 1) -> None:
+        report.rejected += count
+        if len(report.errors) < settings.IMPORT_MAX_REPORTED_ERRORS:
+            report.errors.append(ImportErrorSchema(record=record, error=error))
+
+    batch: list[BaseModel] = []
+    first_record = 1
+
+    async def flush() -> None:
+        try:
+            report.imported += await crud.copy_insert(batch)
+            await crud.commit_session()
+        except (DBAPIError, psycopg.Error) as e:
+            error = getattr(e, "orig", None) or e
+            reject(first_record, f"chunk rejected by the database: {error}", len(batch))
+        batch.clear()
+        logger.info("Imported %d rows, rejected %d", report.imported, report.rejected)
+
+    record_number = 0
+    async for record in parse(iter_lines(chunks)):
+        record_number += 1
+        if not batch:
+            first_record = record_number
+        if isinstance(record, Exception):
+            reject(record_number, str(record))
+            continue
+        try:
+            batch.append(in_schema.model_validate(record))
+        except ValidationError as e:
+            reject(record_number, str(e.errors(include_url=False)))
+            continue
+        if len(batch) >= chunk_size:
+            await flush()
+    if batch:
+        await flush()
+
+    report.elapsed_seconds = time.perf_counter() - started_at
+    if report.elapsed_seconds > 0:
+        report.rows_per_second = report.imported / report.elapsed_seconds
+    return report
@@ -1,17 +1,60 @@
 import abc
-from typing import Generic, Type, TypeVar
+import datetime
+import functools
+import inspect
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    ClassVar,
+    Generic,
+    Hashable,
+    Iterable,
+    Iterator,
+    Mapping,
+    Optional,
+    Sequence,
+    Type,
+    TypeVar,
+)
 
-from core.config import EnvironmentEnum, settings
+from core.config import DbSessionScopeEnum, EnvironmentEnum, settings
 from db.base_class import TimestampedBase
+from db.connections import OperationConnection
+from db.crud.cache import CacheBackend, crud_cache
+from db.crud.count import CountStrategy, count_cache
+from db.crud.cursor import decode_cursor, encode_cursor
+from db.crud.single_flight import SingleFlight, single_flight
+from db.crud.statements import StatementCacheStats, statement_cache_stats
 from fastapi import HTTPException
 from logging_setup import setup_gunicorn_logging
+from observability.timing import timed
+from psycopg import sql
 from schemas.base import BasePaginatedSchema, BaseSchema
-from sqlalchemy import ColumnClause, column, delete, func, update
-from sqlalchemy.engine import Result
-from sqlalchemy.ext.asyncio import AsyncSession
+from schemas.serialization import page_adapter_of
+from sqlalchemy import (
+    ColumnClause,
+    ColumnElement,
+    Double,
+    Integer,
+    Interval,
+    any_,
+    bindparam,
+    cast,
+    column,
+    delete,
+    func,
+    insert,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Result, Row
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine, AsyncSession
 from sqlalchemy.future import select
 from sqlalchemy.orm import InstrumentedAttribute
-from sqlalchemy.sql import Select, Update
+from sqlalchemy.sql import Executable, Select, Update
 from sqlalchemy.sql.elements import UnaryExpression
 
 IN_SCHEMA = TypeVar("IN_SCHEMA", bound=BaseSchema)
@@ -20,16 +63,121 @@ PARTIAL_UPDATE_SCHEMA = TypeVar("PARTIAL_UPDATE_SCHEMA", bound=BaseSchema)
 PAGINATED_SCHEMA = TypeVar("PAGINATED_SCHEMA", bound=BasePaginatedSchema)
 TABLE = TypeVar("TABLE", bound=TimestampedBase)
 S = TypeVar("S", Select, Update)
+T = TypeVar("T")
+
+WINDOW_TOTAL_LABEL = "total_count__"
+SEARCH_RANK_LABEL = "search_rank__"
+ESTIMATED_COUNT_STATEMENT = text(
+    "SELECT reltuples::bigint FROM pg_class WHERE oid = CAST(:table AS regclass)"
+)
+PENDING_WRITES_KEY = "crud_pending_writes"
 
 logger = setup_gunicorn_logging(__name__)
 
 
+def releases_session(method):
+    """
+    Calls `release_session` once the decorated read has returned
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self: "BaseCrud", *args, **kwargs):
+        result = await method(self, *args, **kwargs)
+        await self.release_session()
+        return result
+
+    return wrapper
+
+
+def coalesced(method):
+    """
+    Lets identical concurrent calls of the decorated read share one query, see
+    `BaseCrud.single_flight`
+    """
+
+    @functools.wraps(method)
+    async def wrapper(self: "BaseCrud", *args, **kwargs):
+        if self.single_flight is None or not self._coalescible:
+            return await method(self, *args, **kwargs)
+        # the engine is part of the key, a replica may not have caught up yet
+        key = (
+            type(self),
+            method.__name__,
+            self._engine,
+            args,
+            tuple(sorted(kwargs.items())),
+        )
+        return await self.single_flight.run(key, lambda: method(self, *args, **kwargs))
+
+    return wrapper
+
+
 class BaseCrud(
     Generic[IN_SCHEMA, PARTIAL_UPDATE_SCHEMA, OUT_SCHEMA, PAGINATED_SCHEMA, TABLE],
     metaclass=abc.ABCMeta,
 ):
-    def __init__(self, db_session: AsyncSession, *args, **kwargs) -> None:
-        self._db_session: AsyncSession = db_session
+    # set by every concrete subclass, a class attribute so that the table is known
+    # without an instance (see `crud_classes`)
+    _table: ClassVar[Type[TimestampedBase]]
+    _statements: dict[Hashable, Any]
+    _statement_stats: StatementCacheStats
+    # searchable classes define `search_vector` and get `search`
+    searchable: bool = False
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        if cls.searchable and cls.search_vector is BaseCrud.search_vector:
+            raise TypeError(f"{cls.__name__} is searchable but has no search_vector")
+        if isinstance(cls.__dict__.get("_table"), property):
+            raise TypeError(f"{cls.__name__}._table must be a class attribute")
+        cls._statements = {}
+        cls._statement_stats = statement_cache_stats[cls.__qualname__] = (
+            StatementCacheStats()
+        )
+
+    def __init__(
+        self,
+        db_session: AsyncSession | AsyncConnection | OperationConnection,
+        *args,
+        **kwargs,
+    ) -> None:
+        """
+        Reads also run on a plain `AsyncConnection` (or `OperationConnection`),
+        without the ORM session's setup, writes need an `AsyncSession`
+        """
+        self._db_session: AsyncSession | AsyncConnection | OperationConnection = (
+            db_session
+        )
+
+    def _statement(self, key: Hashable, build: Callable[[], T]) -> T:
+        """
+        Returns the statement (or column list) kept under `key` for this class,
+        building it on first use. What `build` returns must only depend on the
+        class and on `key`, values go in as bound parameters at execution.
+        """
+        cls = type(self)
+        try:
+            value = cls._statements[key]
+        except KeyError:
+            value = cls._statements[key] = build()
+            cls._statement_stats.misses += 1
+            return value
+        cls._statement_stats.hits += 1
+        return value
+
+    def prepare_statements(self) -> None:
+        """
+        Builds the statements of the common reads ahead of the first request
+        :return: None
+        """
+        for active_only in (True, False):
+            self._get_by_id_statement(active_only)
+            self._get_version_by_id_statement(active_only)
+            self._count_statement(active_only)
+            for window_count in (True, False):
+                self._page_statement(active_only, window_count)
+            for seek in (True, False):
+                self._keyset_page_statement(active_only, seek)
 
     async def commit_session(self):
         """
@@ -40,18 +188,70 @@ class BaseCrud(
         if settings.ENVIRONMENT == EnvironmentEnum.TEST:
             logger.info("Skipping session.commit() in test environment")
             await self._db_session.flush()
-            return
+        else:
+            await self._db_session.commit()
 
-        await self._db_session.commit()
+        # concurrent requests may have cached the old rows before the commit landed
+        pending = self._db_session.info.pop(PENDING_WRITES_KEY, {})
+        for crud, entry_ids in pending.values():
+            await crud.invalidate_cache(*entry_ids)
+
+    async def release_session(self):
+        """
+        Ends the read-only transaction of the session when `DB_SESSION_SCOPE` is
+        "operation", so its connection goes back to the pool before the response is
+        serialized. Sessions with writes are left to `commit_session`.
+        An `OperationConnection` is always released.
+        :return: None
+        """
+        if isinstance(self._db_session, OperationConnection):
+            await self._db_session.release()
+            return
+        if settings.DB_SESSION_SCOPE != DbSessionScopeEnum.OPERATION:
+            return
+        if settings.ENVIRONMENT == EnvironmentEnum.TEST:
+            # tests share one session and roll it back at the end
+            return
+        session = self._db_session
+        if not isinstance(session, AsyncSession):
+            # a connection is released by whoever opened it
+            return
+        if not session.in_transaction() or session.info.get(PENDING_WRITES_KEY):
+            return
+        if session.new or session.dirty or session.deleted:
+            return
+        logger.info("Releasing session connection...")
+        # nothing was written, but COMMIT (unlike ROLLBACK) would not lose writes
+        # that bypassed this class
+        await session.commit()
 
     def apply_active_statement(self, stmt: S, active_only: bool) -> S:
         if active_only:
             return stmt.where(self._table.deleted_at.is_(None))
         return stmt
 
-    @property
-    @abc.abstractmethod
-    def _table(self) -> Type[TABLE]: ...
+    def id_in(self, entry_ids: Iterable) -> ColumnElement[bool]:
+        """
+        `id = ANY(:ids)` with the ids bound as a single array parameter
+        """
+        return self._table.id == any_(
+            bindparam("ids", list(entry_ids), type_=ARRAY(self._table.id.type))
+        )
+
+    def apply_keyset_statement(
+        self, stmt: Select, cursor: str, keyset: Sequence[ColumnElement] = None
+    ) -> Select:
+        """
+        Orders the statement by the keyset columns (descending) and seeks past the
+        row encoded in `cursor`. An empty cursor selects the first page.
+        `keyset` defaults to `keyset_columns`.
+        """
+        if keyset is None:
+            keyset = self.keyset_columns
+        stmt = stmt.order_by(*(col.desc() for col in keyset))
+        if cursor:
+            stmt = stmt.where(tuple_(*keyset) < tuple_(*decode_cursor(cursor, keyset)))
+        return stmt
 
     @property
     @abc.abstractmethod
@@ -66,80 +266,738 @@ class BaseCrud(
     def _paginated_schema(self) -> Type[PAGINATED_SCHEMA]: ...
 
     @property
-    def out_schema_columns(self) -> list[ColumnClause]:
-        return [column(i) for i in self._out_schema.model_fields.keys()]
+    def out_schema_columns(self) -> tuple[ColumnClause, ...]:
+        return self._statement(
+            "out_schema_columns",
+            lambda: tuple(column(i) for i in self._out_schema.model_fields.keys()),
+        )
+
+    @property
+    def returning_columns(self) -> tuple[InstrumentedAttribute, ...]:
+        """
+        Table columns matching the output schema, for RETURNING clauses
+        """
+        return self._statement(
+            "returning_columns",
+            lambda: tuple(
+                getattr(self._table, i) for i in self._out_schema.model_fields.keys()
+            ),
+        )
+
+    @property
+    def keyset_columns(self) -> tuple[InstrumentedAttribute, ...]:
+        """
+        Columns used for cursor pagination, the last one must be unique
+        """
+        return self._table.created_at, self._table.id
+
+    @property
+    def search_vector(self) -> Optional[InstrumentedAttribute]:
+        """
+        Full-text search `tsvector` column, searchable classes must override it
+        """
+        return None
+
+    @property
+    def search_config(self) -> str:
+        """
+        Text search configuration the `search_vector` was built with
+        """
+        return "english"
+
+    @property
+    def count_strategy(self) -> CountStrategy:
+        """
+        Default strategy for the `total` of paginated lists
+        """
+        return CountStrategy.EXACT
+
+    @property
+    def cache(self) -> Optional[CacheBackend]:
+        """
+        Backend for read-through caching of `get_by_id` and `get_paginated_list`,
+        None disables caching
+        """
+        return crud_cache
+
+    @property
+    def single_flight(self) -> Optional[SingleFlight]:
+        """
+        Coalesces identical concurrent reads, None disables it
+        """
+        return single_flight
+
+    @property
+    def _engine(self) -> AsyncEngine:
+        if isinstance(self._db_session, AsyncSession):
+            return self._db_session.bind
+        return self._db_session.engine
+
+    @property
+    def _coalescible(self) -> bool:
+        # a session with its own writes must see them, not another session's result
+        session = self._db_session
+        if session.info.get(PENDING_WRITES_KEY):
+            return False
+        return not (
+            isinstance(session, AsyncSession)
+            and (session.new or session.dirty or session.deleted)
+        )
+
+    def _cache_key(self, *parts) -> str:
+        return ":".join(["crud", self._table.__tablename__, *map(str, parts)])
+
+    async def _cache_generation(self) -> int:
+        # bumped by every invalidation, a read that started before a write stores
+        # its (possibly stale) result under a key that is no longer looked up
+        return await self.cache.get_counter(self._cache_key("generation"))
+
+    @property
+    def _cache_readable(self) -> bool:
+        # uncommitted writes of this session must neither be hidden nor cached
+        return self.cache is not None and not self._db_session.info.get(
+            PENDING_WRITES_KEY
+        )
+
+    async def invalidate_cache(self, *entry_ids) -> None:
+        """
+        Drops the cached entries with the given ids and every cached list page
+        """
+        if self.cache is None:
+            return
+        generation = await self._cache_generation()
+        await self.cache.delete(
+            *(
+                self._cache_key("id", generation, entry_id, active_only)
+                for entry_id in entry_ids
+                for active_only in (True, False)
+            )
+        )
+        await self.cache.incr(self._cache_key("generation"))
+
+    async def _record_write(self, *entry_ids) -> None:
+        # kept until commit_session, which invalidates the cache again
+        pending = self._db_session.info.setdefault(PENDING_WRITES_KEY, {})
+        pending.setdefault(self._table.__tablename__, (self, set()))[1].update(
+            entry_ids
+        )
+        await self.invalidate_cache(*entry_ids)
 
     async def create(self, in_schema: IN_SCHEMA) -> OUT_SCHEMA:
         entry = self._table(**in_schema.model_dump())
         self._db_session.add(entry)
         await self._db_session.flush()
-        return self._out_schema.model_validate(entry)
+        await self._record_write(entry.id)
+        with timed("validate"):
+            return self._out_schema.model_validate(entry)
 
-    async def get_by_id(self, entry_id, active_only=True) -> OUT_SCHEMA:
-        result = await self._db_session.execute(
-            self.apply_active_statement(
+    def _get_by_id_statement(self, active_only: bool) -> Select:
+        return self._statement(
+            ("get_by_id", active_only),
+            lambda: self.apply_active_statement(
                 select(*self.out_schema_columns)
                 .select_from(self._table)
-                .where(self._table.id == entry_id),
+                .where(self._table.id == bindparam("entry_id")),
                 active_only,
-            )
+            ),
+        )
+
+    @releases_session
+    @coalesced
+    async def get_by_id(self, entry_id, active_only=True) -> OUT_SCHEMA:
+        cache_key = None
+        if self._cache_readable:
+            generation = await self._cache_generation()
+            cache_key = self._cache_key("id", generation, entry_id, active_only)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached.model_copy(deep=True)
+
+        result = await self._db_session.execute(
+            self._get_by_id_statement(active_only), {"entry_id": entry_id}
         )
         entry = result.first()
         if not entry:
             raise HTTPException(status_code=404, detail="Object not found")
-        return self._out_schema.model_validate(entry)
+        with timed("validate"):
+            out = self._out_schema.model_validate(entry)
+        if cache_key is not None:
+            # callers may change what they get, the cached copy must stay as read
+            await self.cache.set(
+                cache_key, out.model_copy(deep=True), settings.CRUD_CACHE_TTL_SECONDS
+            )
+        return out
+
+    def _get_version_by_id_statement(self, active_only: bool) -> Select:
+        return self._statement(
+            ("get_version_by_id", active_only),
+            lambda: self.apply_active_statement(
+                select(self._table.updated_at).where(
+                    self._table.id == bindparam("entry_id")
+                ),
+                active_only,
+            ),
+        )
+
+    @releases_session
+    async def get_version_by_id(self, entry_id, active_only=True) -> datetime.datetime:
+        """
+        Returns `updated_at` of the entry without fetching the rest of the row
+        """
+        result = await self._db_session.execute(
+            self._get_version_by_id_statement(active_only), {"entry_id": entry_id}
+        )
+        updated_at = result.scalar_one_or_none()
+        if updated_at is None:
+            raise HTTPException(status_code=404, detail="Object not found")
+        return updated_at
+
+    def _update_by_id_statement(
+        self, fields: tuple[str, ...], active_only: bool, returning: bool
+    ) -> Update:
+        def build() -> Update:
+            stmt = self.apply_active_statement(
+                update(self._table).where(self._table.id == bindparam("entry_id")),
+                active_only,
+            ).values({field: bindparam(f"v_{field}") for field in fields})
+            if returning:
+                stmt = stmt.returning(*self.returning_columns)
+            return stmt
+
+        return self._statement(("update_by_id", fields, active_only, returning), build)
+
+    @staticmethod
+    def _update_by_id_params(entry_id, in_data: PARTIAL_UPDATE_SCHEMA) -> dict:
+        values = in_data.model_dump(exclude_unset=True)
+        return {"entry_id": entry_id, **{f"v_{k}": v for k, v in values.items()}}
 
     async def update_by_id(
         self, entry_id, in_data: PARTIAL_UPDATE_SCHEMA, active_only=True, raise_404=True
     ) -> None:
         result = await self._db_session.execute(
-            self.apply_active_statement(
-                update(self._table).where(self._table.id == entry_id), active_only
-            ).values(**in_data.model_dump(exclude_unset=True))
+            self._update_by_id_statement(
+                tuple(sorted(in_data.model_fields_set)), active_only, returning=False
+            ),
+            self._update_by_id_params(entry_id, in_data),
         )
         if result.rowcount == 0 and raise_404:
             raise HTTPException(status_code=404, detail="Object not found")
         await self._db_session.flush()
+        await self._record_write(entry_id)
         return
 
+    async def update_and_get_by_id(
+        self, entry_id, in_data: PARTIAL_UPDATE_SCHEMA, active_only=True
+    ) -> OUT_SCHEMA:
+        """
+        Same as `update_by_id` followed by `get_by_id`, in one UPDATE ... RETURNING
+        """
+        result = await self._db_session.execute(
+            self._update_by_id_statement(
+                tuple(sorted(in_data.model_fields_set)), active_only, returning=True
+            ),
+            self._update_by_id_params(entry_id, in_data),
+        )
+        entry = result.first()
+        if not entry:
+            raise HTTPException(status_code=404, detail="Object not found")
+        await self._record_write(entry_id)
+        with timed("validate"):
+            return self._out_schema.model_validate(entry)
+
     async def delete_by_id(self, entry_id, permanently=False, raise_404=True) -> None:
-        stmt = delete(self._table).where(self._table.id == entry_id)
-        if not permanently:
-            stmt = self.apply_active_statement(
-                update(self._table).where(self._table.id == entry_id), True
+        def build() -> Executable:
+            if permanently:
+                return delete(self._table).where(
+                    self._table.id == bindparam("entry_id")
+                )
+            return self.apply_active_statement(
+                update(self._table).where(self._table.id == bindparam("entry_id")), True
             ).values(deleted_at=func.current_timestamp())
 
-        result = await self._db_session.execute(stmt)
+        result = await self._db_session.execute(
+            self._statement(("delete_by_id", permanently), build),
+            {"entry_id": entry_id},
+        )
         if result.rowcount == 0 and raise_404:  # noqa
             raise HTTPException(status_code=404, detail="Object not found")
 
         await self._db_session.flush()
+        await self._record_write(entry_id)
         return
 
+    async def bulk_create(self, in_schemas: Sequence[IN_SCHEMA]) -> list[OUT_SCHEMA]:
+        """
+        Inserts all entries with multi-row INSERT ... RETURNING statements,
+        the result is in the same order as the input
+        """
+        result = await self._db_session.execute(
+            insert(self._table).returning(
+                *self.returning_columns, sort_by_parameter_order=True
+            ),
+            [in_schema.model_dump() for in_schema in in_schemas],
+        )
+        with timed("validate"):
+            entries = [self._out_schema.model_validate(entry) for entry in result.all()]
+        await self._record_write(*(entry.id for entry in entries))
+        return entries
+
+    async def copy_insert(self, in_schemas: Sequence[IN_SCHEMA]) -> int:
+        """
+        Inserts the entries with COPY ... FROM STDIN on the session's connection.
+        Much faster than INSERT for large loads, but returns nothing back.
+        The copy runs in a savepoint, so a failure only discards its own rows.
+        :return: number of rows copied
+        """
+        fields = list(type(in_schemas[0]).model_fields.keys()) if in_schemas else []
+        if not fields:
+            return 0
+        statement = sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(self._table.__tablename__),
+            sql.SQL(", ").join(map(sql.Identifier, fields)),
+        )
+        async with self._db_session.begin_nested():
+            connection = await self._db_session.connection()
+            raw_connection = await connection.get_raw_connection()
+            async with raw_connection.driver_connection.cursor() as cursor:
+                async with cursor.copy(statement) as copy:
+                    for in_schema in in_schemas:
+                        await copy.write_row(
+                            tuple(getattr(in_schema, field) for field in fields)
+                        )
+        await self._record_write()
+        return len(in_schemas)
+
+    async def bulk_update(
+        self, in_data: Mapping[Any, PARTIAL_UPDATE_SCHEMA], active_only=True
+    ) -> dict[Any, Optional[OUT_SCHEMA]]:
+        """
+        Applies partial updates keyed by entry id. Updates setting the same fields
+        are sent as one executemany batch.
+        :return: the updated entries by id, None for the ids that were not found
+        """
+        table = self._table.__table__
+        found = await self._db_session.execute(
+            self.apply_active_statement(
+                select(self._table.id).where(self.id_in(in_data.keys())), active_only
+            ).with_for_update()
+        )
+        found_ids = set(found.scalars())
+
+        batches: dict[tuple[str, ...], list[dict]] = {}
+        for entry_id in found_ids:
+            values = in_data[entry_id].model_dump(exclude_unset=True)
+            if values:
+                params = {f"v_{key}": value for key, value in values.items()}
+                batches.setdefault(tuple(sorted(values)), []).append(
+                    {"v_id": entry_id, **params}
+                )
+        for keys, params in batches.items():
+            await self._db_session.execute(
+                update(table)
+                .where(table.c.id == bindparam("v_id"))
+                .values({key: bindparam(f"v_{key}") for key in keys}),
+                params,
+            )
+
+        updated: dict[Any, Optional[OUT_SCHEMA]] = dict.fromkeys(in_data.keys())
+        if found_ids:
+            result = await self._db_session.execute(
+                select(*self.returning_columns).where(self.id_in(found_ids))
+            )
+            for entry in result.all():
+                updated[entry.id] = self._out_schema.model_validate(entry)
+            await self._record_write(*found_ids)
+        return updated
+
+    async def bulk_delete(self, entry_ids: Iterable, permanently=False) -> set:
+        """
+        Deletes the entries with one `WHERE id = ANY(...)` statement
+        :return: ids of the entries that were deleted
+        """
+        id_in = self.id_in(entry_ids)
+        stmt = delete(self._table).where(id_in)
+        if not permanently:
+            stmt = self.apply_active_statement(
+                update(self._table).where(id_in), True
+            ).values(deleted_at=func.current_timestamp())
+
+        result = await self._db_session.execute(stmt.returning(self._table.id))
+        deleted_ids = set(result.scalars())
+        await self._record_write(*deleted_ids)
+        return deleted_ids
+
+    async def purge_deleted(
+        self, retention: datetime.timedelta, batch_size: int
+    ) -> int:
+        """
+        Permanently deletes up to `batch_size` entries soft-deleted more than
+        `retention` ago, oldest first. Rows locked by other transactions are
+        skipped rather than waited for.
+        :return: the number of entries deleted
+        """
+
+        def build() -> Executable:
+            expired = (
+                select(self._table.id)
+                .where(
+                    self._table.deleted_at
+                    < func.current_timestamp() - bindparam("retention", type_=Interval)
+                )
+                .order_by(self._table.deleted_at)
+                .limit(bindparam("batch_size", type_=Integer))
+                .with_for_update(skip_locked=True)
+            )
+            return (
+                delete(self._table)
+                .where(self._table.id.in_(expired))
+                .returning(self._table.id)
+            )
+
+        result = await self._db_session.execute(
+            self._statement("purge_deleted", build),
+            {"retention": retention, "batch_size": batch_size},
+        )
+        purged_ids = list(result.scalars())
+        await self._record_write(*purged_ids)
+        return len(purged_ids)
+
+    @releases_session
+    @coalesced
+    async def search(
+        self, query: str, limit: int, cursor: str = "", active_only=True
+    ) -> PAGINATED_SCHEMA:
+        """
+        Full-text search over `search_vector`, best matches first.
+        Pages are selected by seeking on (rank, id), so `cursor` works like in
+        `get_paginated_list`. Matches are not counted, `total` is always None.
+        """
+        if not self.searchable:
+            raise TypeError(f"{type(self).__name__} is not searchable")
+
+        ts_query = func.websearch_to_tsquery(self.search_config, query)
+        # ts_rank_cd returns a real, cast once so that the rank sent back in the
+        # cursor compares equal to the ranks of the rows it ties with
+        rank = cast(func.ts_rank_cd(self.search_vector, ts_query), Double)
+        stmt = self.apply_active_statement(
+            select(*self.out_schema_columns, rank.label(SEARCH_RANK_LABEL))
+            .select_from(self._table)
+            .where(self.search_vector.bool_op("@@")(ts_query)),
+            active_only,
+        )
+        keyset = (rank, self._table.id)
+        result: Result = await self._db_session.execute(
+            self.apply_keyset_statement(stmt, cursor, keyset).limit(limit + 1)
+        )
+        entries = result.all()
+        next_cursor = None
+        if len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = encode_cursor(
+                [getattr(entries[-1], SEARCH_RANK_LABEL), entries[-1].id]
+            )
+        with timed("validate"):
+            return self._paginated_schema(
+                total=None,
+                items=[self._out_schema.model_validate(entry) for entry in entries],
+                next_cursor=next_cursor,
+            )
+
+    async def stream_all(
+        self, active_only=True, batch_size: int = 1000
+    ) -> AsyncIterator[list[OUT_SCHEMA]]:
+        """
+        Yields all entries in batches of `batch_size`, in primary key order.
+        Rows are fetched through a server-side cursor, so memory use does not
+        depend on the size of the table.
+        """
+        result = await self._db_session.stream(
+            self.apply_active_statement(
+                select(*self.out_schema_columns).select_from(self._table), active_only
+            )
+            .order_by(self._table.id)
+            .execution_options(yield_per=batch_size)
+        )
+        async for partition in result.partitions():
+            yield [self._out_schema.model_validate(entry) for entry in partition]
+
+    def _count_statement(self, active_only: bool) -> Select:
+        return self._statement(
+            ("count", active_only),
+            lambda: self.apply_active_statement(
+                select(func.count()).select_from(self._table), active_only
+            ),
+        )
+
+    @releases_session
+    async def count(
+        self, active_only=True, strategy: CountStrategy = CountStrategy.EXACT
+    ) -> Optional[int]:
+        """
+        Counts the entries of the table with the given strategy.
+        `window` can only be computed along with a page, so it counts exactly here.
+        """
+        return await self._count(active_only, strategy)
+
+    async def _count(self, active_only: bool, strategy: CountStrategy) -> Optional[int]:
+        if strategy == CountStrategy.NONE:
+            return None
+
+        if strategy == CountStrategy.ESTIMATED:
+            result: Result = await self._db_session.execute(
+                ESTIMATED_COUNT_STATEMENT, {"table": self._table.__tablename__}
+            )
+            estimate = result.scalar()
+            # reltuples is -1 until the table has been vacuumed or analyzed
+            if estimate is not None and estimate >= 0:
+                return estimate
+            strategy = CountStrategy.EXACT
+
+        cache_key = (self._table.__tablename__, active_only)
+        if strategy == CountStrategy.CACHED:
+            cached = count_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        result: Result = await self._db_session.execute(
+            self._count_statement(active_only)
+        )
+        total = result.scalar()
+        if strategy == CountStrategy.CACHED:
+            count_cache.set(cache_key, total, settings.COUNT_CACHE_TTL_SECONDS)
+        return total
+
+    def _page_columns_statement(
+        self, active_only: bool, window_count: bool, keyset: bool = False
+    ) -> Select:
+        def build() -> Select:
+            columns = [*self.out_schema_columns]
+            if keyset:
+                selected = {col.name for col in columns}
+                columns += [
+                    col for col in self.keyset_columns if col.key not in selected
+                ]
+            if window_count:
+                columns.append(func.count().over().label(WINDOW_TOTAL_LABEL))
+            return self.apply_active_statement(
+                select(*columns).select_from(self._table), active_only
+            )
+
+        return self._statement(
+            ("page_columns", active_only, window_count, keyset), build
+        )
+
+    def _page_statement(self, active_only: bool, window_count: bool) -> Select:
+        """
+        A page in `default_ordering`, LIMIT and OFFSET are bound parameters
+        """
+        return self._statement(
+            ("page", active_only, window_count),
+            lambda: self._page_columns_statement(active_only, window_count)
+            .order_by(self.default_ordering)
+            .limit(bindparam("limit", type_=Integer))
+            .offset(bindparam("offset", type_=Integer)),
+        )
+
+    def _keyset_page_statement(self, active_only: bool, seek: bool) -> Select:
+        """
+        A page in `keyset_columns` order, past the row whose keyset values are
+        bound as `cursor_0`, `cursor_1`... when `seek` is set
+        """
+
+        def build() -> Select:
+            stmt = self._page_columns_statement(
+                active_only, False, keyset=True
+            ).order_by(*(col.desc() for col in self.keyset_columns))
+            if seek:
+                stmt = stmt.where(
+                    tuple_(*self.keyset_columns)
+                    < tuple_(
+                        *(
+                            bindparam(f"cursor_{i}", type_=col.type)
+                            for i, col in enumerate(self.keyset_columns)
+                        )
+                    )
+                )
+            return stmt.limit(bindparam("limit", type_=Integer))
+
+        return self._statement(("keyset_page", active_only, seek), build)
+
+    def _list_cache_key(
+        self,
+        kind: str,
+        generation: int,
+        limit: int,
+        offset: int,
+        active_only: bool,
+        cursor: Optional[str],
+        count_strategy: CountStrategy,
+    ) -> str:
+        return self._cache_key(
+            kind,
+            generation,
+            active_only,
+            limit,
+            f"offset={offset}" if cursor is None else f"cursor={cursor}",
+            count_strategy.value,
+        )
+
+    async def _cached_list(self, kind: str, *params) -> tuple[Optional[str], Any]:
+        """
+        Looks a list page up in the cache
+        :return: the cache key to store the page under (None if it must not be
+        cached) and the cached page, if any
+        """
+        if not self._cache_readable:
+            return None, None
+        generation = await self._cache_generation()
+        cache_key = self._list_cache_key(kind, generation, *params)
+        return cache_key, await self.cache.get(cache_key)
+
+    async def _paginated_rows(
+        self,
+        limit: int,
+        offset: int,
+        order_by: Optional[UnaryExpression],
+        active_only: bool,
+        cursor: Optional[str],
+        count_strategy: CountStrategy,
+    ) -> tuple[Optional[int], Sequence[Row], Optional[str]]:
+        """
+        Fetches a page of rows, see `get_paginated_list`
+        :return: the total, the rows and the next cursor
+        """
+        # past the cursor the window would only count the remaining rows
+        window_count = count_strategy == CountStrategy.WINDOW and cursor is None
+
+        if cursor is not None:
+            params = {"limit": limit + 1}
+            if cursor:
+                for i, value in enumerate(decode_cursor(cursor, self.keyset_columns)):
+                    params[f"cursor_{i}"] = value
+            stmt = self._keyset_page_statement(active_only, seek=bool(cursor))
+        elif order_by is None:
+            params = {"limit": limit, "offset": offset}
+            stmt = self._page_statement(active_only, window_count)
+        else:
+            params = {}
+            stmt = (
+                self._page_columns_statement(active_only, window_count)
+                .order_by(order_by)
+                .limit(limit)
+                .offset(offset)
+            )
+
+        result: Result = await self._db_session.execute(stmt, params)
+        entries = result.all()
+        next_cursor = None
+        if cursor is not None and len(entries) > limit:
+            entries = entries[:limit]
+            next_cursor = encode_cursor(
+                [getattr(entries[-1], col.key) for col in self.keyset_columns]
+            )
+
+        if not window_count:
+            total = await self._count(active_only, count_strategy)
+        elif entries:
+            total = entries[0]._mapping[WINDOW_TOTAL_LABEL]
+        elif offset == 0:
+            total = 0
+        else:
+            # the offset is past the last row, so there is no row to carry the count
+            total = await self._count(active_only, CountStrategy.EXACT)
+        return total, entries, next_cursor
+
+    @releases_session
+    @coalesced
     async def get_paginated_list(
         self,
         limit: int,
         offset: int,
         order_by: UnaryExpression = None,
         active_only=True,
+        cursor: Optional[str] = None,
+        count_strategy: Optional[CountStrategy] = None,
     ) -> PAGINATED_SCHEMA:
+        """
+        Returns a page of entries. When `cursor` is given (an empty string for the
+        first page), the page is selected by seeking on `keyset_columns` instead of
+        using OFFSET, `offset` and `order_by` are ignored and `next_cursor` is set
+        if more entries follow.
+        `count_strategy` overrides the class-level `count_strategy` for this call.
+        """
+        if count_strategy is None:
+            count_strategy = self.count_strategy
+
+        cache_key = None
         if order_by is None:
-            order_by = self.default_ordering
-        result: Result = await self._db_session.execute(
-            self.apply_active_statement(
-                select(*self.out_schema_columns).select_from(self._table), active_only
+            cache_key, cached = await self._cached_list(
+                "list", limit, offset, active_only, cursor, count_strategy
             )
-            .order_by(order_by)
-            .limit(limit)
-            .offset(offset)
+            if cached is not None:
+                return cached.model_copy(deep=True)
+
+        total, entries, next_cursor = await self._paginated_rows(
+            limit, offset, order_by, active_only, cursor, count_strategy
         )
-        entries = result.all()
-        total_count: Result = await self._db_session.execute(
-            self.apply_active_statement(
-                select(func.count()).select_from(self._table), active_only
+        with timed("validate"):
+            page = self._paginated_schema(
+                total=total,
+                items=[self._out_schema.model_validate(entry) for entry in entries],
+                next_cursor=next_cursor,
             )
+        if cache_key is not None:
+            await self.cache.set(
+                cache_key, page.model_copy(deep=True), settings.CRUD_CACHE_TTL_SECONDS
+            )
+        return page
+
+    @releases_session
+    @coalesced
+    async def get_paginated_list_json(
+        self,
+        limit: int,
+        offset: int,
+        active_only=True,
+        cursor: Optional[str] = None,
+        count_strategy: Optional[CountStrategy] = None,
+    ) -> bytes:
+        """
+        Same page as `get_paginated_list`, encoded to JSON straight from the rows
+        without building schema instances. `_out_schema` must not customize its
+        serialization (validators are not run either).
+        """
+        if count_strategy is None:
+            count_strategy = self.count_strategy
+
+        cache_key, cached = await self._cached_list(
+            "list-json", limit, offset, active_only, cursor, count_strategy
         )
-        return self._paginated_schema(
-            total=total_count.scalar(),
-            items=[self._out_schema.model_validate(entry) for entry in entries],
+        if cached is not None:
+            return cached
+
+        total, entries, next_cursor = await self._paginated_rows(
+            limit, offset, None, active_only, cursor, count_strategy
         )
+        with timed("serialize"):
+            page = page_adapter_of(self._out_schema).dump_json(
+                {
+                    "total": total,
+                    "items": [entry._asdict() for entry in entries],
+                    "next_cursor": next_cursor,
+                }
+            )
+        if cache_key is not None:
+            await self.cache.set(cache_key, page, settings.CRUD_CACHE_TTL_SECONDS)
+        return page
+
+
+def crud_classes(base: type[BaseCrud] = BaseCrud) -> Iterator[type[BaseCrud]]:
+    """
+    The concrete subclasses of `base`, base classes before their subclasses.
+    Only the classes of imported modules are found.
+    """
+    for cls in base.__subclasses__():
+        if not inspect.isabstract(cls):
+            yield cls
+        yield from crud_classes(cls)
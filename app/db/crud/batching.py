@@ -0,0 +1,134 @@
+import asyncio
+import functools
+from dataclasses import asdict, dataclass
+from typing import AsyncContextManager, Callable, Optional
+
+from core.config import settings
+from db.crud.base import BaseCrud
+from logging_setup import setup_gunicorn_logging
+from schemas.base import BaseSchema
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = setup_gunicorn_logging(__name__)
+
+SessionFactory = Callable[[], AsyncContextManager[AsyncSession]]
+
+
+@dataclass
+class InsertBatchStats:
+    batches: int = 0
+    rows: int = 0
+    # batches whose multi-row INSERT failed and that were retried row by row
+    row_by_row: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class InsertBatcher:
+    """
+    Gathers the `create` calls of concurrent requests for up to `window` seconds
+    or `max_rows` rows, then inserts them with one multi-row INSERT ... RETURNING
+    and commits them together. Every call gets its own row back once the commit
+    is done. If the batch fails, its rows are inserted one by one, each in a
+    savepoint, so that only the failing ones get the error.
+    A row is inserted even when its caller is cancelled after queueing it.
+    """
+
+    def __init__(
+        self, crud_class: type[BaseCrud], window: float, max_rows: int
+    ) -> None:
+        self.crud_class = crud_class
+        self.window = window
+        self.max_rows = max_rows
+        self.stats = InsertBatchStats()
+        self._pending: list[tuple[BaseSchema, asyncio.Future]] = []
+        self._session_factory: Optional[SessionFactory] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # keeps the flushing tasks referenced until they are done
+        self._flushes: set[asyncio.Task] = set()
+
+    async def create(
+        self, in_schema: BaseSchema, session_factory: SessionFactory
+    ) -> BaseSchema:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((in_schema, future))
+        if len(self._pending) == 1:
+            # the batch runs on a session of the request that opened it
+            self._session_factory = session_factory
+            self._timer = loop.call_later(self.window, self._flush_pending)
+        if len(self._pending) >= self.max_rows:
+            self._flush_pending()
+        return await asyncio.shield(future)
+
+    def _flush_pending(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        task = asyncio.create_task(self._flush(batch, self._session_factory))
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    async def _flush(
+        self,
+        batch: list[tuple[BaseSchema, asyncio.Future]],
+        session_factory: SessionFactory,
+    ) -> None:
+        self.stats.batches += 1
+        self.stats.rows += len(batch)
+        results: list = []
+        try:
+            async with session_factory() as session:
+                crud = self.crud_class(session)
+                try:
+                    async with session.begin_nested():
+                        results = await crud.bulk_create([row for row, _ in batch])
+                except Exception:
+                    logger.warning(
+                        "Batched insert of %d rows failed, inserting them one by one",
+                        len(batch),
+                        exc_info=True,
+                    )
+                    self.stats.row_by_row += 1
+                    results = [await self._insert_one(crud, row) for row, _ in batch]
+                await crud.commit_session()
+        except Exception as error:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    @staticmethod
+    async def _insert_one(crud: BaseCrud, row: BaseSchema):
+        """
+        :return: the created entry, or the exception inserting it raised
+        """
+        try:
+            async with crud._db_session.begin_nested():
+                (created,) = await crud.bulk_create([row])
+        except Exception as error:
+            return error
+        return created
+
+
+@functools.cache
+def insert_batcher_of(crud_class: type[BaseCrud]) -> InsertBatcher:
+    """
+    The worker's batcher of `crud_class`, whose constructor must only take the
+    session
+    """
+    return InsertBatcher(
+        crud_class,
+        window=settings.CRUD_INSERT_BATCH_WINDOW_MS / 1000,
+        max_rows=settings.CRUD_INSERT_BATCH_MAX_ROWS,
+    )
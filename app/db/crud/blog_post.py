@@ -1,6 +1,8 @@
 from typing import Type
 
 from db.crud.base import BaseCrud
+from db.crud.count import CountStrategy
+from db.tables.blog_post import SEARCH_CONFIG
 from db.tables.blog_post import BlogPost as BlogPostTable
 from schemas.blog_post import (
     InBlogPostSchema,
@@ -8,6 +10,7 @@ from schemas.blog_post import (
     PaginatedBlogPostSchema,
     UpdateBlogPostSchema,
 )
+from sqlalchemy.orm import InstrumentedAttribute
 from sqlalchemy.sql.elements import UnaryExpression
 
 
@@ -20,9 +23,8 @@ class BlogPostCrud(
         BlogPostTable,
     ]
 ):
-    @property
-    def _table(self) -> Type[BlogPostTable]:
-        return BlogPostTable
+    _table = BlogPostTable
+    searchable = True
 
     @property
     def _out_schema(self) -> Type[OutBlogPostSchema]:
@@ -35,3 +37,15 @@ class BlogPostCrud(
     @property
     def _paginated_schema(self) -> Type[PaginatedBlogPostSchema]:
         return PaginatedBlogPostSchema
+
+    @property
+    def count_strategy(self) -> CountStrategy:
+        return CountStrategy.WINDOW
+
+    @property
+    def search_vector(self) -> InstrumentedAttribute:
+        return BlogPostTable.search_vector
+
+    @property
+    def search_config(self) -> str:
+        return SEARCH_CONFIG
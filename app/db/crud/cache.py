@@ -0,0 +1,104 @@
+import abc
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from core.config import settings
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class CacheBackend(abc.ABC):
+    """
+    Storage used by `BaseCrud` for read-through caching.
+
+    Values are never None, so None always means a miss. Counters live apart from
+    the cached values and must not be evicted, because entries and list pages are
+    keyed by the current value of a generation counter.
+    """
+
+    def __init__(self) -> None:
+        self.stats = CacheStats()
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> Any: ...
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: Any, ttl: float) -> None: ...
+
+    @abc.abstractmethod
+    async def delete(self, *keys: str) -> None: ...
+
+    @abc.abstractmethod
+    async def get_counter(self, key: str) -> int: ...
+
+    @abc.abstractmethod
+    async def incr(self, key: str) -> int: ...
+
+
+class LRUCache(CacheBackend):
+    """
+    Bounded in-process cache, evicts the least recently used entry when full
+    and treats entries older than their TTL as misses
+    """
+
+    def __init__(self, max_entries: int) -> None:
+        super().__init__()
+        self._max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+        self._counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    async def delete(self, *keys: str) -> None:
+        for key in keys:
+            if self._entries.pop(key, None) is not None:
+                self.stats.invalidations += 1
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    async def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+crud_cache: Optional[CacheBackend] = (
+    LRUCache(settings.CRUD_CACHE_MAX_ENTRIES) if settings.CRUD_CACHE_ENABLED else None
+)
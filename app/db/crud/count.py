@@ -0,0 +1,53 @@
+import time
+from enum import Enum
+from typing import Hashable, Optional
+
+
+class CountStrategy(str, Enum):
+    """
+    How `BaseCrud.get_paginated_list` computes `total`, from most to least accurate:
+
+    - exact: a separate `SELECT count(*)` with the same filters
+    - window: `count(*) OVER()` added to the page query, no extra round trip
+    - cached: an exact count reused for `COUNT_CACHE_TTL_SECONDS`
+    - estimated: the planner estimate from `pg_class.reltuples`, ignores filters
+    - none: no count at all, `total` is null
+    """
+
+    EXACT = "exact"
+    WINDOW = "window"
+    CACHED = "cached"
+    ESTIMATED = "estimated"
+    NONE = "none"
+
+
+class CountCache:
+    """
+    A tiny TTL cache for total counts, keyed by table and filters
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self._max_entries = max_entries
+        self._entries: dict[Hashable, tuple[float, int]] = {}
+
+    def get(self, key: Hashable) -> Optional[int]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self._entries.pop(key, None)
+            return None
+        return value
+
+    def set(self, key: Hashable, value: int, ttl: float) -> None:
+        if key not in self._entries and len(self._entries) >= self._max_entries:
+            # dicts keep insertion order, so this drops the oldest entry
+            self._entries.pop(next(iter(self._entries)))
+        self._entries[key] = (time.monotonic() + ttl, value)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+count_cache = CountCache()
@@ -0,0 +1,60 @@
+import base64
+import json
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Annotated, Any, Optional, Sequence
+
+from fastapi import HTTPException
+from pydantic import Field, TypeAdapter
+from sqlalchemy import BigInteger, Integer, SmallInteger
+from sqlalchemy.sql import ColumnElement
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot encode {type(value).__name__} in a cursor")
+
+
+# the range of integer columns: the database fails on values outside of it instead of
+# comparing them. Subclasses of Integer come first
+INTEGER_BOUNDS = ((SmallInteger, 2**15), (BigInteger, 2**63), (Integer, 2**31))
+
+
+def _value_spec(column: ColumnElement) -> tuple[type, Optional[int]]:
+    for integer_type, bound in INTEGER_BOUNDS:
+        if isinstance(column.type, integer_type):
+            return int, bound
+    return column.type.python_type, None
+
+
+@lru_cache()
+def _keyset_adapter(specs: tuple[tuple[type, Optional[int]], ...]) -> TypeAdapter:
+    value_types = tuple(
+        Annotated[python_type, Field(ge=-bound, lt=bound)] if bound else python_type
+        for python_type, bound in specs
+    )
+    return TypeAdapter(tuple[value_types])
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    """
+    Encodes the keyset values of the last row of a page into an opaque token
+    """
+    payload = json.dumps(list(values), default=_json_default, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str, columns: Sequence[ColumnElement]) -> list[Any]:
+    """
+    Decodes a token produced by `encode_cursor` back into values typed after `columns`
+    :raises HTTPException: 400 if the token is malformed, or its values do not fit
+        the columns
+    """
+    adapter = _keyset_adapter(tuple(_value_spec(col) for col in columns))
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        # strict, so that e.g. an integer is not taken for a timestamp
+        return list(adapter.validate_json(raw, strict=True))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
@@ -0,0 +1,67 @@
+import asyncio
+from dataclasses import asdict, dataclass
+from typing import Any, Awaitable, Callable, Hashable, Optional
+
+from core.config import settings
+
+
+@dataclass
+class SingleFlightStats:
+    # calls that ran their query
+    leaders: int = 0
+    # calls that got the result of an identical call already in flight
+    coalesced: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+class SingleFlight:
+    """
+    Lets concurrent identical reads of a worker share one query: the first call
+    for a key runs it, the calls arriving while it is in flight await its result
+    (or its exception). Nothing is kept once the call has finished.
+    """
+
+    def __init__(self) -> None:
+        self.stats = SingleFlightStats()
+        self._calls: dict[Hashable, asyncio.Future] = {}
+
+    async def run(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        future = self._calls.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+            try:
+                # shielded, so that a follower going away does not cancel the call
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # the leader was cancelled (e.g. its client disconnected)
+                return await call()
+
+        future = self._calls[key] = asyncio.get_running_loop().create_future()
+        self.stats.leaders += 1
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as error:
+            future.set_exception(error)
+            # followers retrieve it, the leader raises it below
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+
+single_flight: Optional[SingleFlight] = (
+    SingleFlight() if settings.CRUD_SINGLE_FLIGHT_ENABLED else None
+)
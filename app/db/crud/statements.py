@@ -0,0 +1,54 @@
+from dataclasses import asdict, dataclass
+
+from sqlalchemy.engine.interfaces import CacheStats
+
+
+@dataclass
+class StatementCacheStats:
+    """
+    Reuse of the statements a CRUD class builds once and keeps, see
+    `BaseCrud._statement`
+    """
+
+    hits: int = 0
+    # one per statement built, these are never evicted
+    misses: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+@dataclass
+class CompiledCacheStats:
+    """
+    How often SQLAlchemy found the compiled form of an executed statement in the
+    engine's compiled cache (sized by DB_QUERY_CACHE_SIZE)
+    """
+
+    hits: int = 0
+    misses: int = 0
+    # textual SQL, DDL and statements that opted out of caching
+    uncached: int = 0
+
+    def as_dict(self) -> dict[str, int]:
+        return asdict(self)
+
+
+# CRUD class name -> stats, filled in as BaseCrud subclasses are created
+statement_cache_stats: dict[str, StatementCacheStats] = {}
+compiled_cache_stats = CompiledCacheStats()
+
+
+def count_compiled_cache_use(
+    conn, cursor, statement, parameters, context, executemany
+) -> None:
+    """
+    `after_cursor_execute` listener feeding `compiled_cache_stats`
+    """
+    cache_hit = getattr(context, "cache_hit", None)
+    if cache_hit == CacheStats.CACHE_HIT:
+        compiled_cache_stats.hits += 1
+    elif cache_hit == CacheStats.CACHE_MISS:
+        compiled_cache_stats.misses += 1
+    else:
+        compiled_cache_stats.uncached += 1
@@ -0,0 +1,50 @@
+"""blog post search vector
+
+Revision ID: 3f0b7c2e9a41
+Revises: 8d7ac6d49b3c
+Create Date: 2026-10-18 09:12:40.118204
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "3f0b7c2e9a41"
+down_revision = "8d7ac6d49b3c"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # adding a stored generated column rewrites the table under an exclusive lock
+    op.add_column(
+        "blog_post",
+        sa.Column(
+            "search_vector",
+            postgresql.TSVECTOR(),
+            sa.Computed("to_tsvector('english', title || ' ' || body)", persisted=True),
+            nullable=True,
+        ),
+    )
+    # build the index without blocking writes, which cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_blog_post_search_vector",
+            "blog_post",
+            ["search_vector"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_blog_post_search_vector",
+            table_name="blog_post",
+            postgresql_concurrently=True,
+        )
+    op.drop_column("blog_post", "search_vector")
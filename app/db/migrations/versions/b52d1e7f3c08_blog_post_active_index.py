@@ -0,0 +1,39 @@
+"""blog post active index
+
+Revision ID: b52d1e7f3c08
+Revises: 3f0b7c2e9a41
+Create Date: 2026-10-18 10:03:11.642977
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "b52d1e7f3c08"
+down_revision = "3f0b7c2e9a41"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # build the index without blocking writes, which cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_blog_post_active_created_at",
+            "blog_post",
+            [sa.text("created_at DESC"), sa.text("id DESC")],
+            unique=False,
+            postgresql_where=sa.text("deleted_at IS NULL"),
+            postgresql_include=["updated_at"],
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_blog_post_active_created_at",
+            table_name="blog_post",
+            postgresql_concurrently=True,
+        )
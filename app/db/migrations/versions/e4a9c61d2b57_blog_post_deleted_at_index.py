@@ -0,0 +1,38 @@
+"""blog post deleted_at index
+
+Revision ID: e4a9c61d2b57
+Revises: b52d1e7f3c08
+Create Date: 2026-10-18 16:41:27.318205
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e4a9c61d2b57"
+down_revision = "b52d1e7f3c08"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # build the index without blocking writes, which cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_blog_post_deleted_at",
+            "blog_post",
+            ["deleted_at"],
+            unique=False,
+            postgresql_where=sa.text("deleted_at IS NOT NULL"),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_blog_post_deleted_at",
+            table_name="blog_post",
+            postgresql_concurrently=True,
+        )
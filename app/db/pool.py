@@ -0,0 +1,164 @@
+import bisect
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Mapping
+
+from logging_setup import setup_gunicorn_logging
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = setup_gunicorn_logging(__name__)
+
+# upper bounds in seconds, the last bucket (+Inf) is implicit
+CHECKOUT_WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# weight of the newest checkout in the moving average of recent waits
+RECENT_WAIT_WEIGHT = 0.2
+
+
+@dataclass
+class PoolStats:
+    checkouts: int = 0
+    timeouts: int = 0
+    wait_seconds_sum: float = 0.0
+    wait_buckets: list[int] = field(
+        default_factory=lambda: [0] * (len(CHECKOUT_WAIT_BUCKETS) + 1)
+    )
+    # exponentially weighted moving average of the checkout waits
+    recent_wait_seconds: float = 0.0
+
+    def observe_wait(self, seconds: float) -> None:
+        self.wait_seconds_sum += seconds
+        self.recent_wait_seconds += RECENT_WAIT_WEIGHT * (
+            seconds - self.recent_wait_seconds
+        )
+        self.wait_buckets[bisect.bisect_left(CHECKOUT_WAIT_BUCKETS, seconds)] += 1
+
+    def wait_histogram(self) -> dict[str, int]:
+        """
+        Cumulative counts of checkout waits, keyed by their upper bound
+        :return: `{"0.001": ..., ..., "+Inf": ...}`
+        """
+        histogram, total = {}, 0
+        for bound, count in zip((*CHECKOUT_WAIT_BUCKETS, "+Inf"), self.wait_buckets):
+            total += count
+            histogram[str(bound)] = total
+        return histogram
+
+
+class InstrumentedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """
+    The default pool of async engines, counting checkouts and timeouts and timing
+    how long each checkout waited for a connection (including connecting)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self) -> "InstrumentedAsyncAdaptedQueuePool":
+        # engine.dispose() swaps the pool, the numbers should survive that
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.timeouts += 1
+            raise
+        finally:
+            self.stats.observe_wait(time.perf_counter() - started)
+        self.stats.checkouts += 1
+        return connection
+
+
+def pool_status(engine: AsyncEngine) -> dict:
+    pool = engine.sync_engine.pool
+    status = {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "idle": pool.checkedin(),
+        # negative while the pool has not reached its size yet
+        "overflow": max(pool.overflow(), 0),
+    }
+    stats = getattr(pool, "stats", None)
+    if stats is not None:
+        status.update(
+            checkouts=stats.checkouts,
+            timeouts=stats.timeouts,
+            wait_seconds_sum=stats.wait_seconds_sum,
+            wait_seconds_histogram=stats.wait_histogram(),
+        )
+    return status
+
+
+def estimated_checkout_wait(engine: AsyncEngine) -> float:
+    """
+    How long a checkout would wait right now: nothing while the pool can hand out
+    or open a connection, the recent average wait once it is exhausted
+    """
+    pool = engine.sync_engine.pool
+    stats = getattr(pool, "stats", None)
+    if stats is None or pool._max_overflow < 0:  # no stats, or no limit
+        return 0.0
+    if pool.checkedout() < pool.size() + pool._max_overflow:
+        return 0.0
+    return stats.recent_wait_seconds
+
+
+def pools_status(engines: Mapping[str, AsyncEngine]) -> dict:
+    """
+    Pool status of the current worker, each gunicorn worker has its own pools
+    """
+    return {
+        "pid": os.getpid(),
+        "pools": {name: pool_status(engine) for name, engine in engines.items()},
+    }
+
+
+def register_pool_metrics(engines: Mapping[str, AsyncEngine]) -> None:
+    """
+    Exposes the pool status through OpenTelemetry metrics, a no-op unless the
+    telemetry dependency group is installed
+    """
+    try:
+        from opentelemetry.metrics import CallbackOptions, Observation, get_meter
+    except ImportError:
+        return
+
+    def observe(key: str):
+        def callback(_: CallbackOptions):
+            for name, engine in engines.items():
+                yield Observation(
+                    pool_status(engine).get(key, 0),
+                    {"pool": name, "pid": os.getpid()},
+                )
+
+        return callback
+
+    def observe_wait_buckets(_: CallbackOptions):
+        for name, engine in engines.items():
+            histogram = pool_status(engine).get("wait_seconds_histogram", {})
+            for bound, count in histogram.items():
+                yield Observation(
+                    count, {"pool": name, "pid": os.getpid(), "le": bound}
+                )
+
+    meter = get_meter(__name__)
+    for key in ("checked_out", "idle", "overflow"):
+        meter.create_observable_gauge(
+            f"db.pool.{key}", callbacks=[observe(key)], unit="{connection}"
+        )
+    for key in ("checkouts", "timeouts"):
+        meter.create_observable_counter(f"db.pool.{key}", callbacks=[observe(key)])
+    meter.create_observable_counter(
+        "db.pool.wait_seconds_sum", callbacks=[observe("wait_seconds_sum")], unit="s"
+    )
+    meter.create_observable_counter(
+        "db.pool.wait_seconds_bucket", callbacks=[observe_wait_buckets]
+    )
+    logger.info("Registered db pool metrics")
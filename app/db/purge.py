@@ -0,0 +1,129 @@
+import asyncio
+import datetime
+import time
+from dataclasses import dataclass
+from typing import AsyncContextManager, Callable, Optional
+
+from core.config import settings
+from db.crud.base import BaseCrud, crud_classes
+from logging_setup import setup_gunicorn_logging
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+logger = setup_gunicorn_logging(__name__)
+
+# arbitrary key of the advisory lock that lets one process purge at a time
+PURGE_ADVISORY_LOCK_KEY = 0x70757267
+
+SessionFactory = Callable[[], AsyncContextManager[AsyncSession]]
+
+
+@dataclass
+class PurgeReport:
+    table: str
+    purged: int = 0
+    batches: int = 0
+    elapsed_seconds: float = 0.0
+
+
+def purgeable_crud_classes() -> list[type[BaseCrud]]:
+    """
+    One CRUD class per table, the first one found (base classes come before their
+    subclasses). Their constructors must only take the session.
+    """
+    by_table = {}
+    for cls in crud_classes():
+        by_table.setdefault(cls._table.__tablename__, cls)
+    return list(by_table.values())
+
+
+async def purge_soft_deleted(
+    crud_class: type[BaseCrud],
+    session_factory: SessionFactory,
+    retention: datetime.timedelta,
+    batch_size: int,
+    pause: float,
+    max_seconds: float = 0,
+) -> PurgeReport:
+    """
+    Permanently deletes the rows soft-deleted more than `retention` ago, one
+    transaction of up to `batch_size` rows at a time with a `pause` in between so
+    that the purge does not hog the database. Stops once a batch comes back short
+    or after `max_seconds` (0 means no limit).
+    """
+    started = time.perf_counter()
+    report = PurgeReport(table=crud_class._table.__tablename__)
+    while True:
+        async with session_factory() as session:
+            crud = crud_class(session)
+            purged = await crud.purge_deleted(retention, batch_size)
+            await crud.commit_session()
+        report.purged += purged
+        report.batches += 1
+        if purged < batch_size:
+            break
+        if max_seconds and time.perf_counter() - started >= max_seconds:
+            logger.info("Purge of %s stopped after %.0f s", report.table, max_seconds)
+            break
+        await asyncio.sleep(pause)
+    report.elapsed_seconds = time.perf_counter() - started
+    return report
+
+
+async def purge_all(
+    engine: AsyncEngine,
+    session_factory: SessionFactory,
+    retention: Optional[datetime.timedelta] = None,
+) -> Optional[list[PurgeReport]]:
+    """
+    Purges every CRUD table, unless another process holds the purge lock
+    :return: a report per table, None when the lock was taken
+    """
+    if retention is None:
+        retention = datetime.timedelta(days=settings.PURGE_RETENTION_DAYS)
+    # autocommit, so the lock holder is not left idle in a transaction
+    async with engine.connect() as lock_connection:
+        await lock_connection.execution_options(isolation_level="AUTOCOMMIT")
+        locked = await lock_connection.scalar(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": PURGE_ADVISORY_LOCK_KEY}
+        )
+        if not locked:
+            logger.info("Skipping the purge, another process is running it")
+            return None
+        try:
+            reports = []
+            for crud_class in purgeable_crud_classes():
+                report = await purge_soft_deleted(
+                    crud_class,
+                    session_factory,
+                    retention,
+                    settings.PURGE_BATCH_SIZE,
+                    settings.PURGE_BATCH_PAUSE_SECONDS,
+                    settings.PURGE_MAX_SECONDS,
+                )
+                logger.info(
+                    "Purged %d rows of %s in %d batches, %.2f s",
+                    report.purged,
+                    report.table,
+                    report.batches,
+                    report.elapsed_seconds,
+                )
+                reports.append(report)
+            return reports
+        finally:
+            await lock_connection.execute(
+                text("SELECT pg_advisory_unlock(:key)"),
+                {"key": PURGE_ADVISORY_LOCK_KEY},
+            )
+
+
+async def run_periodic_purge(engine: AsyncEngine, session_factory: SessionFactory):
+    """
+    Purges every PURGE_INTERVAL_SECONDS until cancelled, one worker at a time
+    """
+    while True:
+        await asyncio.sleep(settings.PURGE_INTERVAL_SECONDS)
+        try:
+            await purge_all(engine, session_factory)
+        except Exception:
+            logger.exception("Purge of soft-deleted rows failed")
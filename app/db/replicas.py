@@ -0,0 +1,125 @@
+import asyncio
+import itertools
+import math
+import time
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from core.config import ReplicaStrategyEnum
+from logging_setup import setup_gunicorn_logging
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+logger = setup_gunicorn_logging(__name__)
+
+# zero when the replica has replayed everything it received (an idle primary does
+# not move pg_last_xact_replay_timestamp), and zero on a server that is not in
+# recovery, so a plain second instance can stand in for a replica locally
+REPLICATION_LAG_STATEMENT = text("""
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(
+            EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0
+        )
+    END
+    """)
+# scoped to the probe's transaction, which is rolled back when it is done
+PROBE_STATEMENT_TIMEOUT = text("SELECT set_config('statement_timeout', :timeout, true)")
+
+
+@dataclass
+class _LagProbe:
+    lag: float = math.inf
+    checked_at: float = -math.inf
+    running: bool = False
+
+
+class ReplicaRouter:
+    """
+    Picks the replica engine a read should go to.
+
+    Replication lag is probed at most once per `lag_check_interval` for each
+    replica; replicas lagging more than `max_lag` seconds, or failing the probe
+    within `probe_timeout` seconds, are skipped. Reads arriving while a probe runs
+    go by the previous result rather than wait for it. `get_engine` returns None
+    when no replica qualifies, callers fall back to the primary then.
+    """
+
+    def __init__(
+        self,
+        engines: Sequence[AsyncEngine],
+        strategy: ReplicaStrategyEnum,
+        max_lag: float,
+        lag_check_interval: float,
+        probe_timeout: float,
+    ):
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.probe_timeout = probe_timeout
+        self._next = itertools.cycle(range(len(self.engines)))
+        self._probes = [_LagProbe() for _ in self.engines]
+
+    def __bool__(self) -> bool:
+        return bool(self.engines)
+
+    def _candidates(self) -> list[int]:
+        if self.strategy == ReplicaStrategyEnum.LEAST_BUSY:
+            # the replica with the fewest connections checked out of this worker's pool
+            return sorted(
+                range(len(self.engines)),
+                key=lambda i: self.engines[i].pool.checkedout(),
+            )
+        start = next(self._next)
+        return [(start + i) % len(self.engines) for i in range(len(self.engines))]
+
+    async def _probe_lag(self, engine: AsyncEngine) -> float:
+        try:
+            # bounds connecting too, e.g. to a replica that stopped answering
+            async with asyncio.timeout(self.probe_timeout):
+                async with engine.connect() as conn:
+                    # lets the server give up on the statement as well
+                    await conn.execute(
+                        PROBE_STATEMENT_TIMEOUT,
+                        {"timeout": f"{int(self.probe_timeout * 1000)}ms"},
+                    )
+                    return float(
+                        (await conn.execute(REPLICATION_LAG_STATEMENT)).scalar()
+                    )
+        except Exception:
+            logger.warning(
+                "Replication lag probe failed for %s", engine.url, exc_info=True
+            )
+            return math.inf
+
+    async def lag(self, index: int) -> float:
+        probe = self._probes[index]
+        if probe.running or (
+            time.monotonic() - probe.checked_at < self.lag_check_interval
+        ):
+            return probe.lag
+        probe.running = True
+        try:
+            probe.lag = await self._probe_lag(self.engines[index])
+            probe.checked_at = time.monotonic()
+        finally:
+            probe.running = False
+        if probe.lag > self.max_lag:
+            logger.warning(
+                "Replica %s lags %.1fs behind, reading from the primary",
+                self.engines[index].url,
+                probe.lag,
+            )
+        return probe.lag
+
+    async def get_engine(self) -> Optional[AsyncEngine]:
+        for index in self._candidates():
+            if await self.lag(index) <= self.max_lag:
+                return self.engines[index]
+        return None
+
+    async def dispose(self) -> None:
+        for engine in self.engines:
+            await engine.dispose()
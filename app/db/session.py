@@ -1,8 +1,51 @@
 from core.config import settings
-from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from db.crud.statements import count_compiled_cache_use
+from db.pool import InstrumentedAsyncAdaptedQueuePool
+from db.replicas import ReplicaRouter
+from observability.queries import track_engine_queries
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, async_sessionmaker, create_async_engine
 
-engine = create_async_engine(
-    str(settings.DATABASE_URL),
-    echo=settings.DB_ECHO_LOG,
-)
+
+def create_engine(url: str) -> AsyncEngine:
+    connect_args = {}
+    if settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS > 0:
+        connect_args["options"] = (
+            "-c idle_in_transaction_session_timeout="
+            f"{settings.DB_IDLE_IN_TRANSACTION_TIMEOUT_MS}"
+        )
+    engine_ = create_async_engine(
+        url,
+        echo=settings.DB_ECHO_LOG,
+        connect_args=connect_args,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        pool_use_lifo=settings.DB_POOL_USE_LIFO,
+    )
+    event.listen(engine_.sync_engine, "after_cursor_execute", count_compiled_cache_use)
+    track_engine_queries(engine_)
+    return engine_
+
+
+engine = create_engine(str(settings.DATABASE_URL))
 async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+replica_router = ReplicaRouter(
+    [create_engine(str(url)) for url in settings.DATABASE_REPLICA_URLS],
+    strategy=settings.DB_REPLICA_STRATEGY,
+    max_lag=settings.DB_REPLICA_MAX_LAG_SECONDS,
+    lag_check_interval=settings.DB_REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+    probe_timeout=settings.DB_REPLICA_PROBE_TIMEOUT_SECONDS,
+)
+
+
+def named_engines() -> dict[str, AsyncEngine]:
+    return {
+        "primary": engine,
+        **{f"replica_{i}": e for i, e in enumerate(replica_router.engines)},
+    }
@@ -1,7 +1,49 @@
+from typing import Optional
+
 from db.base_class import TimestampedBase
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import Computed, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import Mapped, declared_attr, mapped_column
+
+SEARCH_CONFIG = "english"
 
 
 class BlogPost(TimestampedBase):
     title: Mapped[str] = mapped_column(nullable=False)
     body: Mapped[str] = mapped_column(nullable=False)
+    search_vector: Mapped[Optional[str]] = mapped_column(
+        TSVECTOR,
+        Computed(
+            f"to_tsvector('{SEARCH_CONFIG}', title || ' ' || body)", persisted=True
+        ),
+        # only ever used in WHERE / ORDER BY clauses, never loaded
+        deferred=True,
+    )
+
+    @declared_attr.directive
+    def __table_args__(cls) -> tuple:
+        return (
+            Index(
+                f"ix_{cls.__tablename__}_search_vector",
+                "search_vector",
+                postgresql_using="gin",
+            ),
+        )
+
+
+# serves every active-only read: pages ordered by created_at (with or without a
+# cursor), counts and updated_at probes, without touching deleted rows
+Index(
+    f"ix_{BlogPost.__tablename__}_active_created_at",
+    BlogPost.created_at.desc(),
+    BlogPost.id.desc(),
+    postgresql_where=BlogPost.deleted_at.is_(None),
+    postgresql_include=["updated_at"],
+)
+
+# finds the rows to purge without scanning the active ones
+Index(
+    f"ix_{BlogPost.__tablename__}_deleted_at",
+    BlogPost.deleted_at,
+    postgresql_where=BlogPost.deleted_at.is_not(None),
+)
@@ -1,6 +1,9 @@
 import logging
+import os
+import shutil
 
 from hyperdx.opentelemetry import configure_opentelemetry
+from prometheus_client import multiprocess
 
 
 def post_fork(server, worker):
@@ -12,3 +15,17 @@ def post_fork(server, worker):
 
     otel_handler = gunicorn_logger.root.handlers[-1]
     gunicorn_logger.addHandler(otel_handler)
+
+
+def on_starting(server):
+    # metrics of a previous run would be added to the new workers' ones
+    multiproc_dir = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        shutil.rmtree(multiproc_dir, ignore_errors=True)
+        os.makedirs(multiproc_dir)
+
+
+def child_exit(server, worker):
+    # keeps the counters of the exited worker, its live gauges are no longer current
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        multiprocess.mark_process_dead(worker.pid)
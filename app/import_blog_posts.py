@@ -0,0 +1,63 @@
+import argparse
+import asyncio
+import logging
+import sys
+from typing import AsyncIterator, Optional
+
+from db.copy_import import copy_import
+from db.crud.blog_post import BlogPostCrud
+from db.session import async_session
+from schemas.base import RecordFormat
+from schemas.blog_post import InBlogPostSchema
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+read_size = 1 << 16
+
+
+async def read_chunks(path: str) -> AsyncIterator[bytes]:
+    # blocking file reads run in a thread, off the event loop
+    source = (
+        sys.stdin.buffer if path == "-" else await asyncio.to_thread(open, path, "rb")
+    )
+    with source:
+        while chunk := await asyncio.to_thread(source.read, read_size):
+            yield chunk
+
+
+async def main(
+    path: str, record_format: Optional[RecordFormat], chunk_size: Optional[int]
+):
+    if record_format is None:
+        record_format = (
+            RecordFormat.CSV if path.endswith(".csv") else RecordFormat.NDJSON
+        )
+    async with async_session() as session:
+        report = await copy_import(
+            BlogPostCrud(session),
+            InBlogPostSchema,
+            read_chunks(path),
+            record_format,
+            chunk_size,
+        )
+    for error in report.errors:
+        logger.warning("record %d: %s", error.record, error.error)
+    logger.info(
+        "Imported %d rows, rejected %d in %.2fs (%.0f rows/s)",
+        report.imported,
+        report.rejected,
+        report.elapsed_seconds,
+        report.rows_per_second,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Import blog posts with COPY")
+    parser.add_argument("path", help="NDJSON or CSV file, - for stdin")
+    parser.add_argument("--format", type=RecordFormat, choices=list(RecordFormat))
+    parser.add_argument(
+        "--chunk-size", type=int, help="rows per commit, IMPORT_CHUNK_SIZE by default"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.format, args.chunk_size))
@@ -1,22 +1,157 @@
+import atexit
+import copy
 import logging
+import queue
+import random
+import threading
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from core.config import settings
+
+try:
+    from opentelemetry import context as otel_context
+except ImportError:  # the telemetry dependency group is not installed
+    otel_context = None
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps a `rate` fraction of the records below WARNING, drops the rest
+    """
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or random.random() < self.rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `per_second` records below WARNING through per second, allowing
+    bursts of the same size, and drops the rest
+    """
+
+    def __init__(self, per_second: float):
+        super().__init__()
+        self.per_second = per_second
+        self.dropped = 0
+        self._tokens = per_second
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.per_second,
+                self._tokens + (now - self._updated_at) * self.per_second,
+            )
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+        self.dropped += 1
+        return False
+
+
+class DeferredFormatQueueHandler(QueueHandler):
+    """
+    Puts records on the queue without formatting them, the listener's handlers do
+    that in the background thread. Log arguments must therefore not be mutated
+    after the logging call. Tracebacks are rendered right away, and the
+    OpenTelemetry context is kept with the record for trace correlation.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.exc_info = None
+        if otel_context is not None:
+            record.otel_context = otel_context.get_current()
+        return record
+
+
+class ContextQueueListener(QueueListener):
+    def handle(self, record: logging.LogRecord) -> None:
+        token = None
+        if otel_context is not None and hasattr(record, "otel_context"):
+            token = otel_context.attach(record.otel_context)
+        try:
+            super().handle(record)
+        finally:
+            if token is not None:
+                otel_context.detach(token)
+
+
+_queue_handler: Optional[QueueHandler] = None
+
+
+def _get_queue_handler(handlers: list[logging.Handler]) -> QueueHandler:
+    """
+    One queue and listener thread per process, feeding `handlers`
+    """
+    global _queue_handler
+    if _queue_handler is None:
+        log_queue = queue.SimpleQueue()
+        listener = ContextQueueListener(
+            log_queue, *handlers, respect_handler_level=True
+        )
+        listener.start()
+        # flushes what is still queued when the worker exits
+        atexit.register(listener.stop)
+        _queue_handler = DeferredFormatQueueHandler(log_queue)
+    return _queue_handler
+
+
+def _add_filters(app_logger: logging.Logger) -> None:
+    if any(
+        isinstance(f, (SamplingFilter, RateLimitFilter)) for f in app_logger.filters
+    ):
+        return
+    rate = settings.LOG_SAMPLE_RATES.get(app_logger.name)
+    if rate is not None:
+        app_logger.addFilter(SamplingFilter(rate))
+    per_second = settings.LOG_RATE_LIMITS.get(app_logger.name)
+    if per_second is not None:
+        app_logger.addFilter(RateLimitFilter(per_second))
 
 
 def setup_gunicorn_logging(logger_name: str = None) -> logging.Logger:
     """
     Route this app's logger to Gunicorn's error handlers when running under Gunicorn.
     Falls back to normal root logging otherwise.
+    With LOG_QUEUE_ENABLED the records go through a queue to a background thread,
+    which formats and writes them with those handlers.
     """
     gunicorn_logger = logging.getLogger("gunicorn.error")
     app_logger = logging.getLogger(logger_name) if logger_name else logging.getLogger()
 
     if gunicorn_logger.handlers:
         # re-use Gunicorn's handlers
-        app_logger.handlers = gunicorn_logger.handlers
+        handlers = gunicorn_logger.handlers
+        app_logger.handlers = handlers
         app_logger.setLevel(gunicorn_logger.level)
         app_logger.propagate = False
     else:
         # Not under Gunicorn (e.g., local `uvicorn app:app`), keep default behavior
         if not app_logger.handlers:
             logging.basicConfig(level=logging.INFO)
+        handlers = logging.getLogger().handlers
+
+    if settings.LOG_QUEUE_ENABLED and app_logger is not logging.getLogger():
+        app_logger.handlers = [_get_queue_handler(list(handlers))]
+        app_logger.propagate = False
+    _add_filters(app_logger)
 
     return app_logger
@@ -1,14 +1,26 @@
+import asyncio
+import contextlib
+import functools
 from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from fastapi.openapi.docs import get_redoc_html
 from fastapi.openapi.utils import get_openapi
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST
 
-from api import v1
+from api import diagnostics, v1
+from api.admission import AdmissionMiddleware, admission_controller
 from api.dependencies.docs_security import basic_http_credentials
 from core.config import settings
-from db.session import engine
+from db.pool import register_pool_metrics
+from db.purge import run_periodic_purge
+from db.session import async_session, engine, named_engines, replica_router
+from observability import instrumentation
+from observability.queries import QueryCountMiddleware
+from observability.timing import ServerTimingMiddleware
+from warmup import warm_up
 
 description = """
 FastAPI template project 🚀
@@ -17,9 +29,27 @@ version = "v0.0.1"
 
 
 @asynccontextmanager
-async def lifespan(_: FastAPI):
+async def lifespan(app_: FastAPI):
+    register_pool_metrics(named_engines())
+    if settings.WARMUP_ENABLED:
+        await warm_up(app_, engine, build_openapi)
+    sample_task = None
+    if settings.METRICS_ENABLED and instrumentation.MULTIPROC_DIR is not None:
+        sample_task = asyncio.create_task(instrumentation.sample_periodically())
+    purge_task = None
+    if settings.PURGE_ENABLED:
+        purge_task = asyncio.create_task(run_periodic_purge(engine, async_session))
     yield
+    if purge_task is not None:
+        purge_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await purge_task
+    if sample_task is not None:
+        sample_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await sample_task
     await engine.dispose()
+    await replica_router.dispose()
 
 
 app = FastAPI(
@@ -38,13 +68,33 @@ app = FastAPI(
 )
 
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=settings.TRUSTED_HOSTS)
+if admission_controller is not None:
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission_controller,
+        exempt_paths=settings.ADMISSION_EXEMPT_PATHS,
+        retry_after=settings.ADMISSION_RETRY_AFTER_SECONDS,
+    )
+if settings.SERVER_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
+# added after, so it wraps ServerTimingMiddleware and both share the query count
+if settings.DB_QUERY_COUNT_HEADER:
+    app.add_middleware(QueryCountMiddleware)
+if settings.METRICS_ENABLED:
+    app.add_middleware(instrumentation.MetricsMiddleware)
+    for name, engine_ in named_engines().items():
+        instrumentation.instrument_engine(engine_, name)
+    instrumentation.register_pool_sampler(named_engines())
+    if admission_controller is not None:
+        instrumentation.register_admission_sampler(admission_controller)
 
 # include routes here
 app.include_router(v1.api_router)
+app.include_router(diagnostics.router)
 
 
-@app.get("/openapi.json", include_in_schema=False)
-async def openapi(_: str = Depends(basic_http_credentials)):
+@functools.cache
+def build_openapi() -> dict:
     schema = get_openapi(
         title=settings.PROJECT_NAME + " | API Documentation",
         description=description,
@@ -60,6 +110,12 @@ async def openapi(_: str = Depends(basic_http_credentials)):
     return schema
 
 
+@app.get("/openapi.json", include_in_schema=False)
+async def openapi(_: str = Depends(basic_http_credentials)):
+    # the schema is built once, and skips jsonable_encoder on the way out
+    return JSONResponse(build_openapi())
+
+
 @app.get(
     "/docs", include_in_schema=False, dependencies=[Depends(basic_http_credentials)]
 )
@@ -77,6 +133,17 @@ async def health_check() -> str:
     return "OK"
 
 
+if settings.METRICS_ENABLED:
+
+    @app.get(
+        "/metrics",
+        include_in_schema=False,
+        dependencies=[Depends(basic_http_credentials)],
+    )
+    async def metrics() -> Response:
+        return Response(instrumentation.metrics_text(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     import uvicorn
 
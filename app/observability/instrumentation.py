@@ -0,0 +1,229 @@
+import asyncio
+import functools
+import os
+import re
+import time
+from typing import Callable, Mapping
+
+from core.config import settings
+from db.pool import pool_status
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+REQUEST_DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1, 2.5, 5, 10,
+)  # fmt: skip
+STATEMENT_DURATION_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+)  # fmt: skip
+
+# set for Gunicorn workers (see gunicorn.conf.py), prometheus_client then keeps the
+# values in memory-mapped files there and any worker can report all of them. It is
+# read when prometheus_client is imported, so it must be an environment variable.
+MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+registry = CollectorRegistry()
+http_requests = Counter(
+    "http_requests",
+    "Finished HTTP requests",
+    ("method", "route", "status"),
+    registry=registry,
+)
+http_request_duration = Histogram(
+    "http_request_duration_seconds",
+    "Time until the response was sent",
+    ("method", "route"),
+    buckets=REQUEST_DURATION_BUCKETS,
+    registry=registry,
+)
+http_requests_in_flight = Gauge(
+    "http_requests_in_flight",
+    "HTTP requests being handled",
+    multiprocess_mode="livesum",
+    registry=registry,
+)
+db_statement_duration = Histogram(
+    "db_statement_duration_seconds",
+    "Time spent executing a statement, by operation and first table",
+    ("engine", "statement"),
+    buckets=STATEMENT_DURATION_BUCKETS,
+    registry=registry,
+)
+db_pool_connections = Gauge(
+    "db_pool_connections",
+    "Connections of the pool, by state",
+    ("pool", "state"),
+    multiprocess_mode="livesum",
+    registry=registry,
+)
+db_pool_checkouts = Counter(
+    "db_pool_checkouts", "Connection checkouts", ("pool",), registry=registry
+)
+db_pool_timeouts = Counter(
+    "db_pool_timeouts", "Checkouts that timed out", ("pool",), registry=registry
+)
+http_requests_shed = Counter(
+    "http_requests_shed",
+    "Requests refused by admission control",
+    ("reason",),
+    registry=registry,
+)
+http_requests_queued = Gauge(
+    "http_requests_queued",
+    "Requests waiting for admission",
+    multiprocess_mode="livesum",
+    registry=registry,
+)
+
+# called before every scrape and every METRICS_SAMPLE_INTERVAL_SECONDS, for
+# values that are read from elsewhere rather than counted here
+samplers: list[Callable[[], None]] = []
+# totals kept elsewhere, as last added to their counter
+_sampled_totals: dict[tuple[Counter, tuple[str, ...]], float] = {}
+
+
+def _inc_to(counter: Counter, total: float, *labels: str) -> None:
+    """
+    Increments `counter` so that it grows along with a total kept elsewhere
+    """
+    key = (counter, labels)
+    delta = total - _sampled_totals.get(key, 0)
+    if delta > 0:
+        counter.labels(*labels).inc(delta)
+    _sampled_totals[key] = total
+
+
+class MetricsMiddleware:
+    """
+    Counts and times requests by route template (e.g. `/v1/blog/{entry_id}`), so
+    that path parameters do not multiply the label values
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        http_requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            http_requests_in_flight.dec()
+            # the router puts the matched route into the scope
+            route = scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            http_request_duration.labels(method, path).observe(
+                time.perf_counter() - started
+            )
+            http_requests.labels(method, path, str(status_code)).inc()
+
+
+STATEMENT_TABLE = re.compile(r"\b(?:FROM|INTO|UPDATE|JOIN)\s+([\"\w.]+)", re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=1024)
+def statement_label(statement: str) -> str:
+    """
+    :return: e.g. `SELECT blog_post`, cached per statement text
+    """
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+    match = STATEMENT_TABLE.search(statement)
+    if match is None:
+        return operation
+    return f"{operation} {match.group(1).strip(chr(34))}"
+
+
+def instrument_engine(engine: AsyncEngine, name: str) -> None:
+    """
+    Times every statement the engine executes
+    """
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        conn.info.setdefault("metrics_started_at", []).append(time.perf_counter())
+
+    def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+        started_at = conn.info["metrics_started_at"].pop()
+        db_statement_duration.labels(name, statement_label(statement)).observe(
+            time.perf_counter() - started_at
+        )
+
+    def handle_error(exception_context):
+        # after_cursor_execute is skipped for failing statements
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("metrics_started_at"):
+            conn.info["metrics_started_at"].pop()
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
+
+
+def register_pool_sampler(engines: Mapping[str, AsyncEngine]) -> None:
+    def sample() -> None:
+        for name, engine in engines.items():
+            status = pool_status(engine)
+            for state in ("checked_out", "idle", "overflow"):
+                db_pool_connections.labels(name, state).set(status[state])
+            _inc_to(db_pool_checkouts, status.get("checkouts", 0), name)
+            _inc_to(db_pool_timeouts, status.get("timeouts", 0), name)
+
+    samplers.append(sample)
+
+
+def register_admission_sampler(controller) -> None:
+    def sample() -> None:
+        status = controller.status()
+        for reason, count in status["shed"].items():
+            _inc_to(http_requests_shed, count, reason)
+        http_requests_queued.set(status["waiting"])
+
+    samplers.append(sample)
+
+
+def sample_metrics() -> None:
+    for sample in samplers:
+        sample()
+
+
+def metrics_text() -> bytes:
+    """
+    This worker's metrics, or those of every worker in multiprocess mode
+    """
+    sample_metrics()
+    if MULTIPROC_DIR is None:
+        return generate_latest(registry)
+    collected = CollectorRegistry()
+    multiprocess.MultiProcessCollector(collected)
+    return generate_latest(collected)
+
+
+async def sample_periodically() -> None:
+    """
+    Samples this worker's metrics every METRICS_SAMPLE_INTERVAL_SECONDS until
+    cancelled, so that a scrape of another worker sees them up to date
+    """
+    while True:
+        sample_metrics()
+        await asyncio.sleep(settings.METRICS_SAMPLE_INTERVAL_SECONDS)
@@ -0,0 +1,121 @@
+import contextlib
+import functools
+import hashlib
+import re
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+from core.config import settings
+from logging_setup import setup_gunicorn_logging
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = setup_gunicorn_logging(__name__)
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|%\(\w+\)s|\$\d+|\b\d+(?:\.\d+)?\b")
+VALUE_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+
+
+@dataclass
+class QueryStats:
+    count: int = 0
+    seconds: float = 0.0
+
+
+# set for the duration of a request (or any `track_queries` block)
+current_query_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "current_query_stats", default=None
+)
+
+
+@contextlib.contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """
+    Counts and times the statements executed inside the block
+    """
+    stats = QueryStats()
+    token = current_query_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        current_query_stats.reset(token)
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(statement: str) -> tuple[str, str]:
+    """
+    Literals, bound parameters and value lists replaced by `?`, so that the same
+    query with other values gets the same fingerprint
+    :return: a short hash and the normalized statement
+    """
+    normalized = " ".join(LITERALS.sub("?", statement).split())
+    normalized = VALUE_LISTS.sub("(?)", normalized)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:12], normalized
+
+
+def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def after_cursor_execute(conn, cursor, statement, parameters, context, many):
+    seconds = time.perf_counter() - conn.info["query_started_at"].pop()
+    stats = current_query_stats.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += seconds
+    threshold_ms = settings.DB_SLOW_QUERY_MS
+    if threshold_ms > 0 and seconds * 1000 >= threshold_ms:
+        query_id, normalized = fingerprint(statement)
+        logger.warning(
+            "Slow query %s took %.1f ms: %s", query_id, seconds * 1000, normalized
+        )
+
+
+def handle_error(exception_context):
+    # after_cursor_execute is skipped for failing statements
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started_at"):
+        conn.info["query_started_at"].pop()
+        stats = current_query_stats.get()
+        if stats is not None:
+            stats.count += 1
+
+
+def track_engine_queries(engine: AsyncEngine) -> None:
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", handle_error)
+
+
+class QueryCountMiddleware:
+    """
+    Sends the number of statements a request executed, and the time they took, as
+    response headers. Statements run after the response has started (e.g. by a
+    streaming body) are not included.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    headers = MutableHeaders(scope=message)
+                    headers[QUERY_COUNT_HEADER] = str(stats.count)
+                    headers[QUERY_TIME_HEADER] = f"{stats.seconds * 1000:.1f}"
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,149 @@
+import contextlib
+import functools
+import inspect
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+from core.config import settings
+from fastapi.routing import APIRoute
+from logging_setup import setup_gunicorn_logging
+from observability.queries import QueryStats, current_query_stats, track_queries
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = setup_gunicorn_logging(__name__)
+
+
+@dataclass
+class RequestTiming:
+    started_at: float
+    queries: QueryStats
+    # set by TimedRoute around the endpoint function
+    endpoint_started_at: Optional[float] = None
+    endpoint_finished_at: Optional[float] = None
+    db_seconds_at_endpoint_finish: float = 0.0
+    phases: dict[str, float] = field(default_factory=dict)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def breakdown(self, now: float) -> dict[str, float]:
+        """
+        :return: seconds per phase, `deps` being the time until the endpoint ran
+        (routing, body parsing and dependencies) and `serialize` what followed it
+        apart from the database (response model validation and JSON encoding)
+        """
+        phases = {"db": self.queries.seconds, **self.phases}
+        if self.endpoint_started_at is not None:
+            phases["deps"] = self.endpoint_started_at - self.started_at
+        if self.endpoint_finished_at is not None:
+            db_after = self.queries.seconds - self.db_seconds_at_endpoint_finish
+            phases["serialize"] = phases.get("serialize", 0.0) + max(
+                now - self.endpoint_finished_at - db_after, 0.0
+            )
+        phases["total"] = now - self.started_at
+        return phases
+
+
+current_timing: ContextVar[Optional[RequestTiming]] = ContextVar(
+    "current_timing", default=None
+)
+
+
+@contextlib.contextmanager
+def timed(phase: str) -> Iterator[None]:
+    """
+    Adds the time spent in the block to `phase` of the current request, if timed
+    """
+    timing = current_timing.get()
+    if timing is None:
+        yield
+        return
+    started_at = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(phase, time.perf_counter() - started_at)
+
+
+class TimedRoute(APIRoute):
+    """
+    Marks when the endpoint function starts and returns, which splits dependency
+    resolution from response serialization in the Server-Timing header
+    """
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        if inspect.iscoroutinefunction(endpoint):
+            endpoint = self._timed_endpoint(endpoint)
+        super().__init__(path, endpoint, **kwargs)
+
+    @staticmethod
+    def _timed_endpoint(endpoint: Callable) -> Callable:
+        # functools.wraps keeps the signature FastAPI reads the parameters from
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kwargs):
+            timing = current_timing.get()
+            if timing is None:
+                return await endpoint(*args, **kwargs)
+            timing.endpoint_started_at = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                timing.endpoint_finished_at = time.perf_counter()
+                timing.db_seconds_at_endpoint_finish = timing.queries.seconds
+
+        return timed_endpoint
+
+
+def server_timing_header(phases: dict[str, float]) -> str:
+    return ", ".join(
+        f"{phase};dur={seconds * 1000:.2f}" for phase, seconds in phases.items()
+    )
+
+
+class ServerTimingMiddleware:
+    """
+    Sends a `Server-Timing` header with the time spent per phase until the
+    response started, and logs it with SERVER_TIMING_LOG
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started_at = time.perf_counter()
+        queries = current_query_stats.get()
+        # shares the statement count of QueryCountMiddleware when it runs too
+        tracking = contextlib.nullcontext(queries) if queries else track_queries()
+        with tracking as queries:
+            timing = RequestTiming(started_at, queries)
+            token = current_timing.set(timing)
+
+            async def send_wrapper(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    phases = timing.breakdown(time.perf_counter())
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing_header(phases))
+                    if settings.SERVER_TIMING_LOG:
+                        route = getattr(scope.get("route"), "path", "unmatched")
+                        logger.info(
+                            "Request timing %s %s %s",
+                            scope["method"],
+                            route,
+                            " ".join(
+                                f"{phase}_ms={seconds * 1000:.2f}"
+                                for phase, seconds in phases.items()
+                            ),
+                        )
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                current_timing.reset(token)
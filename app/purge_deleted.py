@@ -0,0 +1,59 @@
+import argparse
+import asyncio
+import datetime
+import logging
+
+from core.config import settings
+from db.crud import blog_post  # noqa: F401
+from db.purge import purge_all, purgeable_crud_classes
+from db.session import async_session, engine
+from sqlalchemy import text
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def vacuum() -> None:
+    """
+    Makes the space of the purged rows reusable and refreshes the planner statistics
+    """
+    async with engine.connect() as connection:
+        await connection.execution_options(isolation_level="AUTOCOMMIT")
+        for crud_class in purgeable_crud_classes():
+            table = crud_class._table.__tablename__
+            logger.info("Vacuuming %s", table)
+            await connection.execute(text(f'VACUUM (ANALYZE) "{table}"'))
+
+
+async def main(retention_days: float, run_vacuum: bool):
+    reports = await purge_all(
+        engine, async_session, datetime.timedelta(days=retention_days)
+    )
+    if reports is None:
+        logger.warning("Another process is purging, nothing done")
+    else:
+        for report in reports:
+            logger.info(
+                "%s: purged %d rows in %d batches, %.2fs",
+                report.table,
+                report.purged,
+                report.batches,
+                report.elapsed_seconds,
+            )
+        if run_vacuum:
+            await vacuum()
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Permanently delete rows soft-deleted before the retention period"
+    )
+    parser.add_argument(
+        "--retention-days", type=float, default=settings.PURGE_RETENTION_DAYS
+    )
+    parser.add_argument(
+        "--vacuum", action="store_true", help="VACUUM (ANALYZE) the tables afterwards"
+    )
+    args = parser.parse_args()
+    asyncio.run(main(args.retention_days, args.vacuum))
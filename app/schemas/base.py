@@ -1,8 +1,24 @@
-from typing import Generic, TypeVar
+from enum import Enum
+from typing import Generic, Optional, TypeVar
 
 from pydantic import BaseModel, ConfigDict
 
 
+class RecordFormat(str, Enum):
+    """
+    Formats of record streams for exports and imports
+    """
+
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+    @property
+    def media_type(self) -> str:
+        if self == RecordFormat.CSV:
+            return "text/csv"
+        return "application/x-ndjson"
+
+
 class BaseSchema(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -11,7 +27,46 @@ BASE_SCHEMA = TypeVar("BASE_SCHEMA", bound=BaseSchema)
 
 
 class BasePaginatedSchema(BaseModel, Generic[BASE_SCHEMA]):
-    total: int
+    total: Optional[int]
     items: list[BASE_SCHEMA]
+    next_cursor: Optional[str] = None
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class BulkItemResultSchema(BaseModel, Generic[BASE_SCHEMA]):
+    id: Optional[int] = None
+    status: int
+    detail: Optional[str] = None
+    item: Optional[BASE_SCHEMA] = None
+
+
+def unique_ids(ids: list[int]) -> list[int]:
+    """
+    Checks the ids of a bulk request: an id given twice would only get its last
+    change applied, yet every occurrence would be reported as done
+    :raises ValueError: on the first id given more than once
+    """
+    seen = set()
+    for entry_id in ids:
+        if entry_id in seen:
+            raise ValueError(f"id {entry_id} is given more than once")
+        seen.add(entry_id)
+    return ids
+
+
+class BulkResultSchema(BaseModel, Generic[BASE_SCHEMA]):
+    items: list[BulkItemResultSchema[BASE_SCHEMA]]
+
+
+class ImportErrorSchema(BaseModel):
+    record: int
+    error: str
+
+
+class ImportReportSchema(BaseModel):
+    imported: int = 0
+    rejected: int = 0
+    errors: list[ImportErrorSchema] = []
+    elapsed_seconds: float = 0.0
+    rows_per_second: float = 0.0
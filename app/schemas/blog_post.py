@@ -1,6 +1,13 @@
 from datetime import datetime
 
-from schemas.base import BasePaginatedSchema, BaseSchema
+from core.config import settings
+from pydantic import Field, field_validator
+from schemas.base import (
+    BasePaginatedSchema,
+    BaseSchema,
+    BulkResultSchema,
+    unique_ids,
+)
 
 
 class BlogPostSchemaBase(BaseSchema):
@@ -23,3 +30,39 @@ class OutBlogPostSchema(BlogPostSchemaBase):
 
 
 class PaginatedBlogPostSchema(BasePaginatedSchema[OutBlogPostSchema]): ...
+
+
+class BulkCreateBlogPostSchema(BaseSchema):
+    items: list[InBlogPostSchema] = Field(
+        min_length=1, max_length=settings.BULK_MAX_ITEMS
+    )
+
+
+class BulkUpdateBlogPostItemSchema(UpdateBlogPostSchema):
+    id: int
+
+
+class BulkUpdateBlogPostSchema(BaseSchema):
+    items: list[BulkUpdateBlogPostItemSchema] = Field(
+        min_length=1, max_length=settings.BULK_MAX_ITEMS
+    )
+
+    @field_validator("items")
+    @classmethod
+    def items_have_unique_ids(
+        cls, items: list[BulkUpdateBlogPostItemSchema]
+    ) -> list[BulkUpdateBlogPostItemSchema]:
+        unique_ids([item.id for item in items])
+        return items
+
+
+class BulkDeleteBlogPostSchema(BaseSchema):
+    ids: list[int] = Field(min_length=1, max_length=settings.BULK_MAX_ITEMS)
+
+    @field_validator("ids")
+    @classmethod
+    def ids_are_unique(cls, ids: list[int]) -> list[int]:
+        return unique_ids(ids)
+
+
+class BulkBlogPostResultSchema(BulkResultSchema[OutBlogPostSchema]): ...
@@ -0,0 +1,51 @@
+import functools
+from typing import Optional, TypedDict
+
+from pydantic import BaseModel, TypeAdapter
+
+
+def _check_plain_fields(model: type[BaseModel]) -> None:
+    decorators = model.__pydantic_decorators__
+    if (
+        decorators.field_serializers
+        or decorators.model_serializers
+        or decorators.computed_fields
+        or any(
+            field.alias or field.serialization_alias
+            for field in model.model_fields.values()
+        )
+    ):
+        raise TypeError(
+            f"{model.__name__} customizes its serialization, "
+            "it can only be serialized through model instances"
+        )
+
+
+@functools.cache
+def row_type_of(model: type[BaseModel]) -> type:
+    """
+    A TypedDict with the fields of `model`. Serializing plain dicts (or rows)
+    through it gives the same JSON as the model would, without building instances.
+    """
+    _check_plain_fields(model)
+    return TypedDict(
+        f"{model.__name__}Row",
+        {name: field.annotation for name, field in model.model_fields.items()},
+    )
+
+
+@functools.cache
+def page_adapter_of(model: type[BaseModel]) -> TypeAdapter:
+    """
+    Serializes `{"total": ..., "items": [...], "next_cursor": ...}` pages
+    of `model` items straight to JSON
+    """
+    page_type = TypedDict(
+        f"{model.__name__}PageRow",
+        {
+            "total": Optional[int],
+            "items": list[row_type_of(model)],
+            "next_cursor": Optional[str],
+        },
+    )
+    return TypeAdapter(page_type)
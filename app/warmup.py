@@ -0,0 +1,146 @@
+import time
+from contextlib import AsyncExitStack
+from typing import Callable
+
+from core.config import settings
+from db.crud.base import BaseCrud, crud_classes
+from logging_setup import setup_gunicorn_logging
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.sql import Executable
+
+logger = setup_gunicorn_logging(__name__)
+
+# values that make the CRUD reads select nothing, the other parameters are NULL
+WARMUP_PARAMETERS = {"limit": 0, "offset": 0}
+WARMUP_STATEMENT_TIMEOUT_MS = 500
+WARMUP_STATEMENT_TIMEOUT = text(
+    "SELECT set_config('statement_timeout', :timeout, true)"
+)
+
+
+async def open_pool_connections(engine: AsyncEngine, count: int) -> None:
+    """
+    Connects `count` connections at once and puts them back into the pool idle
+    """
+    async with AsyncExitStack() as stack:
+        for _ in range(count):
+            await stack.enter_async_context(engine.connect())
+
+
+def build_crud_statements() -> list[Executable]:
+    """
+    Builds the common statements of every CRUD class
+    """
+    statements = []
+    for cls in crud_classes():
+        # statements only depend on the class, so neither a session nor the
+        # subclass' own constructor arguments are needed to build them
+        crud = cls.__new__(cls)
+        BaseCrud.__init__(crud, None)
+        crud.prepare_statements()
+        statements.extend(
+            statement
+            for statement in cls._statements.values()
+            if isinstance(statement, Executable)
+        )
+    return statements
+
+
+async def fill_compiled_cache(engine: AsyncEngine, statements: list[Executable]):
+    """
+    Runs every statement once, selecting no rows, so that its compiled form is in
+    the engine's compiled cache. The cache is keyed by the statement and the names
+    of its parameters, which are the ones the CRUD methods pass.
+    """
+    async with engine.connect() as connection:
+        # counts have no LIMIT, keep them short on big tables
+        await connection.execute(
+            WARMUP_STATEMENT_TIMEOUT, {"timeout": f"{WARMUP_STATEMENT_TIMEOUT_MS}ms"}
+        )
+        for statement in statements:
+            compiled = statement.compile(dialect=engine.dialect)
+            parameters = {name: WARMUP_PARAMETERS.get(name) for name in compiled.params}
+            try:
+                async with connection.begin_nested():
+                    await connection.execute(statement, parameters)
+            except DBAPIError:
+                # it was compiled and cached before being sent, which is enough
+                logger.debug("Warm-up statement failed", exc_info=True)
+        await connection.rollback()
+
+
+async def asgi_get(app: Callable, path: str) -> int:
+    """
+    Sends a GET request straight to the ASGI app, without a network round trip
+    :return: the response status code
+    """
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost")],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    status_code = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status_code
+        if message["type"] == "http.response.start":
+            status_code = message["status"]
+
+    await app(scope, receive, send)
+    return status_code
+
+
+async def warm_up(app: Callable, engine: AsyncEngine, build_openapi: Callable) -> None:
+    """
+    Does the work the first requests of a fresh worker would otherwise pay for
+    """
+    started = time.perf_counter()
+    connections = min(
+        settings.WARMUP_POOL_CONNECTIONS,
+        settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW,
+    )
+    try:
+        await open_pool_connections(engine, connections)
+    except Exception:
+        # the database may come up later, requests connect on demand then
+        logger.warning("Could not pre-open db connections", exc_info=True)
+
+    statements = build_crud_statements()
+    try:
+        await fill_compiled_cache(engine, statements)
+    except Exception:
+        logger.warning("Could not fill the compiled statement cache", exc_info=True)
+    build_openapi()
+
+    for path in settings.WARMUP_REQUESTS:
+        try:
+            status_code = await asgi_get(app, path)
+        except Exception:
+            # e.g. the database is not up yet, the worker boots all the same
+            logger.warning("Warm-up request to %s failed", path, exc_info=True)
+            continue
+        if status_code >= 400:
+            logger.warning("Warm-up request to %s returned %s", path, status_code)
+
+    logger.info(
+        "Warmed up in %.0f ms: %d db connections, %d statements, %d requests",
+        (time.perf_counter() - started) * 1000,
+        connections,
+        len(statements),
+        len(settings.WARMUP_REQUESTS),
+    )
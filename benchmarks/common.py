@@ -0,0 +1,125 @@
+"""
+Helpers shared by the benchmarks in this directory.
+
+The app reads its settings at import time, so every variant of a benchmark runs in
+a subprocess of its own with the variant's settings in its environment.
+"""
+
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Mapping
+
+APP_DIR = Path(__file__).resolve().parents[1] / "app"
+
+
+def use_app_imports() -> None:
+    if str(APP_DIR) not in sys.path:
+        sys.path.insert(0, str(APP_DIR))
+
+
+def run_variants(
+    script: str,
+    variants: Mapping[str, Mapping[str, str]],
+    args: list[str],
+    env: Mapping[str, str] = None,
+) -> dict[str, dict]:
+    """
+    Runs `script --variant <name> *args` once per variant, with the variant's
+    environment on top of `env`. The last line a run prints is its JSON result.
+    """
+    results = {}
+    for name, variant_env in variants.items():
+        output = subprocess.run(
+            [sys.executable, script, "--variant", name, *args],
+            env={**os.environ, **(env or {}), **variant_env},
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        results[name] = json.loads(output.strip().splitlines()[-1])
+    return results
+
+
+def print_results(results: Mapping[str, Mapping]) -> None:
+    columns = list(next(iter(results.values())).keys())
+    print(" | ".join(["variant", *columns]))
+    for name, result in results.items():
+        cells = [
+            f"{v:.2f}" if isinstance(v, float) else str(v) for v in result.values()
+        ]
+        print(" | ".join([name, *cells]))
+
+
+async def measure(
+    send: Callable[[], Awaitable], requests: int, concurrency: int
+) -> dict:
+    """
+    Calls `send` `requests` times from `concurrency` concurrent workers
+    :return: throughput and latency percentiles
+    """
+    remaining = iter(range(requests))
+    latencies = []
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter()
+            await send()
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "rps": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+    }
+
+
+@asynccontextmanager
+async def app_client() -> AsyncIterator:
+    """
+    An httpx client calling the app in-process, with its lifespan running
+    """
+    use_app_imports()
+    from httpx import ASGITransport, AsyncClient
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        async with AsyncClient(
+            transport=ASGITransport(app=app), base_url="http://localhost"
+        ) as client:
+            yield client
+
+
+async def seed_blog_posts(count: int) -> None:
+    use_app_imports()
+    from core.config import settings
+    from db.crud.blog_post import BlogPostCrud
+    from db.session import async_session, engine
+    from schemas.blog_post import InBlogPostSchema
+
+    async with async_session() as session:
+        crud = BlogPostCrud(session)
+        for start in range(0, count, settings.BULK_MAX_ITEMS):
+            size = min(settings.BULK_MAX_ITEMS, count - start)
+            await crud.bulk_create(
+                [
+                    InBlogPostSchema(
+                        title=f"benchmark post {start + i}",
+                        body="benchmark post body " * 20,
+                    )
+                    for i in range(size)
+                ]
+            )
+            await crud.commit_session()
+    await engine.dispose()
@@ -0,0 +1,64 @@
+"""
+Latency of BaseCrud reads running on an ORM `AsyncSession` and on a plain Core
+`AsyncConnection`, each request taking its session or connection from the pool.
+
+Run it from the repository root against a migrated database, e.g.:
+    uv run python benchmarks/core_reads.py --seed 1000
+"""
+
+import argparse
+import asyncio
+
+from common import measure, print_results, seed_blog_posts, use_app_imports
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict]:
+    use_app_imports()
+    from db.crud.blog_post import BlogPostCrud
+    from db.session import async_session, engine
+    from sqlalchemy import func, select
+
+    async with engine.connect() as connection:
+        crud = BlogPostCrud(connection)
+        post_id = (await connection.execute(select(func.max(crud._table.id)))).scalar()
+    if post_id is None:
+        raise SystemExit("No blog posts to read, pass --seed")
+
+    async def read(crud: BlogPostCrud):
+        if args.read == "get_by_id":
+            await crud.get_by_id(post_id)
+        else:
+            await crud.get_paginated_list(args.limit, 0)
+
+    async def with_session():
+        async with async_session() as session:
+            await read(BlogPostCrud(session))
+
+    async def with_connection():
+        async with engine.connect() as connection:
+            await read(BlogPostCrud(connection))
+
+    results = {}
+    for name, send in (("session", with_session), ("connection", with_connection)):
+        await measure(send, args.concurrency, args.concurrency)  # warm up
+        results[name] = await measure(send, args.requests, args.concurrency)
+    await engine.dispose()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--read", choices=["get_by_id", "page"], default="get_by_id")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--limit", type=int, default=20, help="page size")
+    parser.add_argument("--seed", type=int, default=0, help="posts to insert first")
+    args = parser.parse_args()
+
+    if args.seed:
+        asyncio.run(seed_blog_posts(args.seed))
+    print_results(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
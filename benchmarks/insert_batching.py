@@ -0,0 +1,73 @@
+"""
+Throughput and latency of concurrent `POST /v1/blog` with and without insert
+batching, and how many transactions (batches) the batched runs took.
+
+Run it from the repository root against a migrated database, e.g.:
+    uv run python benchmarks/insert_batching.py --concurrency 64 --window-ms 2 5
+"""
+
+import argparse
+import asyncio
+import json
+
+from common import app_client, measure, print_results, run_variants, use_app_imports
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with app_client() as client:
+
+        async def send():
+            response = await client.post(
+                "/v1/blog", json={"title": "benchmark post", "body": "benchmark body"}
+            )
+            response.raise_for_status()
+
+        await measure(send, args.concurrency, args.concurrency)  # warm up the pool
+        result = await measure(send, args.requests, args.concurrency)
+
+    use_app_imports()
+    from db.crud.batching import insert_batcher_of
+    from db.crud.blog_post import BlogPostCrud
+
+    stats = insert_batcher_of(BlogPostCrud).stats
+    # unbatched, every request (the warm-up ones included) commits on its own
+    return {**result, "transactions": stats.batches or args.requests + args.concurrency}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--pool-size", type=int, default=10)
+    parser.add_argument("--window-ms", type=float, nargs="+", default=[2.0])
+    parser.add_argument("--max-rows", type=int, default=100)
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(asyncio.run(run(args))))
+        return
+
+    variants = {"unbatched": {"CRUD_INSERT_BATCHING_ENABLED": "false"}}
+    for window_ms in args.window_ms:
+        variants[f"batched {window_ms:g} ms"] = {
+            "CRUD_INSERT_BATCHING_ENABLED": "true",
+            "CRUD_INSERT_BATCH_WINDOW_MS": str(window_ms),
+            "CRUD_INSERT_BATCH_MAX_ROWS": str(args.max_rows),
+        }
+    results = run_variants(
+        __file__,
+        variants,
+        [f"--requests={args.requests}", f"--concurrency={args.concurrency}"],
+        env={
+            "DB_POOL_SIZE": str(args.pool_size),
+            "DB_MAX_OVERFLOW": "0",
+            # one log line per request would dominate the measurement
+            "LOG_SAMPLE_RATES": '{"api.v1.blog_post": 0, "db.crud.base": 0}',
+        },
+    )
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Per-request latency of `GET /v1/blog/{id}` with the app's INFO logs written
+synchronously, through the background queue (LOG_QUEUE_ENABLED), through the
+queue with 1% sampling, and not at all.
+
+Logs go to the benchmark's stderr pipe, like a container's. Run it from the
+repository root against a migrated database, e.g.:
+    uv run python benchmarks/logging_cost.py --seed 10
+"""
+
+import argparse
+import asyncio
+import json
+
+from common import app_client, measure, print_results, run_variants, seed_blog_posts
+
+HOT_LOGGERS = ("api.v1.blog_post", "api.dependencies.database", "db.crud.base")
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with app_client() as client:
+        post_id = (await client.get("/v1/blog", params={"limit": 1})).json()
+        post_id = post_id["items"][0]["id"]
+
+        async def send():
+            response = await client.get(f"/v1/blog/{post_id}")
+            response.raise_for_status()
+
+        await measure(send, 100, args.concurrency)  # warm up
+        return await measure(send, args.requests, args.concurrency)
+
+
+def sample_rates(rate: float) -> str:
+    return json.dumps({name: rate for name in HOT_LOGGERS})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0, help="posts to insert first")
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(asyncio.run(run(args))))
+        return
+
+    if args.seed:
+        asyncio.run(seed_blog_posts(args.seed))
+    results = run_variants(
+        __file__,
+        {
+            "sync": {},
+            "queue": {"LOG_QUEUE_ENABLED": "true"},
+            "queue_sampled": {
+                "LOG_QUEUE_ENABLED": "true",
+                "LOG_SAMPLE_RATES": sample_rates(0.01),
+            },
+            "no_logs": {"LOG_SAMPLE_RATES": sample_rates(0.0)},
+        },
+        [f"--requests={args.requests}", f"--concurrency={args.concurrency}"],
+    )
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Items per second served by `GET /v1/blog` with the regular response path
+(model_validate per row, then FastAPI's response_model pass and json encoding)
+and with CRUD_FAST_SERIALIZATION (rows encoded by a cached TypeAdapter).
+
+Run it from the repository root against a migrated database, e.g.:
+    uv run python benchmarks/serialization.py --seed 1000
+"""
+
+import argparse
+import asyncio
+import json
+
+from common import app_client, measure, print_results, run_variants, seed_blog_posts
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with app_client() as client:
+
+        async def send():
+            response = await client.get("/v1/blog", params={"limit": args.limit})
+            response.raise_for_status()
+
+        await measure(send, args.concurrency, args.concurrency)  # warm up
+        result = await measure(send, args.requests, args.concurrency)
+        return {"items_per_second": result["rps"] * args.limit, **result}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--seed", type=int, default=0, help="posts to insert first")
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(asyncio.run(run(args))))
+        return
+
+    if args.seed:
+        asyncio.run(seed_blog_posts(args.seed))
+    results = run_variants(
+        __file__,
+        {
+            "models": {"CRUD_FAST_SERIALIZATION": "false"},
+            "fast": {"CRUD_FAST_SERIALIZATION": "true"},
+        },
+        [
+            f"--requests={args.requests}",
+            f"--concurrency={args.concurrency}",
+            f"--limit={args.limit}",
+        ],
+    )
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
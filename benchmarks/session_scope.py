@@ -0,0 +1,60 @@
+"""
+Throughput of `GET /v1/blog` with DB_SESSION_SCOPE=request and =operation, at the
+same small pool size and a concurrency above it.
+
+Run it from the repository root against a migrated database, e.g.:
+    uv run python benchmarks/session_scope.py --seed 1000 --pool-size 4
+"""
+
+import argparse
+import asyncio
+import json
+
+from common import app_client, measure, print_results, run_variants, seed_blog_posts
+
+
+async def run(args: argparse.Namespace) -> dict:
+    async with app_client() as client:
+
+        async def send():
+            response = await client.get("/v1/blog", params={"limit": args.limit})
+            response.raise_for_status()
+
+        await measure(send, args.concurrency, args.concurrency)  # warm up the pool
+        return await measure(send, args.requests, args.concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--limit", type=int, default=100, help="page size")
+    parser.add_argument("--seed", type=int, default=0, help="posts to insert first")
+    parser.add_argument("--variant", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.variant:
+        print(json.dumps(asyncio.run(run(args))))
+        return
+
+    if args.seed:
+        asyncio.run(seed_blog_posts(args.seed))
+    results = run_variants(
+        __file__,
+        {
+            "request": {"DB_SESSION_SCOPE": "request"},
+            "operation": {"DB_SESSION_SCOPE": "operation"},
+        },
+        [
+            f"--requests={args.requests}",
+            f"--concurrency={args.concurrency}",
+            f"--limit={args.limit}",
+        ],
+        env={"DB_POOL_SIZE": str(args.pool_size), "DB_MAX_OVERFLOW": "0"},
+    )
+    print_results(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+How long a fresh worker takes to import the app and to get through its lifespan
+startup (the warm-up included), checked against budgets so that regressions fail.
+Also lists the heaviest imports, from `python -X importtime`.
+
+Run it from the repository root, against a migrated database for the warm-up:
+    uv run python benchmarks/startup_time.py --import-budget-ms 2000 --startup-budget-ms 1000
+"""
+
+import argparse
+import asyncio
+import json
+import re
+import subprocess
+import sys
+import time
+
+from common import APP_DIR, use_app_imports
+
+IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+async def run_child() -> dict:
+    started = time.perf_counter()
+    use_app_imports()
+    from main import app
+
+    imported = time.perf_counter()
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+    return {
+        "import_ms": (imported - started) * 1000,
+        "startup_ms": (ready - imported) * 1000,
+    }
+
+
+def heaviest_imports(count: int) -> list[tuple[str, float]]:
+    """
+    :return: the direct imports of `main` with their cumulative import time in ms
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=APP_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+    imports = []
+    for line in stderr.splitlines():
+        match = IMPORT_TIME_LINE.match(line)
+        # nesting is indented by two spaces per level, the cumulative time of a
+        # direct import of main includes everything it imports
+        if match and len(match.group(3)) == 2:
+            imports.append((match.group(4), int(match.group(2)) / 1000))
+    return sorted(imports, key=lambda item: item[1], reverse=True)[:count]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=3, help="the fastest run counts")
+    parser.add_argument("--import-budget-ms", type=float, default=2000)
+    parser.add_argument("--startup-budget-ms", type=float, default=1000)
+    parser.add_argument("--top", type=int, default=15, help="heaviest imports to list")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(asyncio.run(run_child())))
+        return
+
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(
+            [sys.executable, __file__, "--child"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+    import_ms = min(run["import_ms"] for run in runs)
+    startup_ms = min(run["startup_ms"] for run in runs)
+
+    print("heaviest imports (cumulative ms):")
+    for module, ms in heaviest_imports(args.top):
+        print(f"  {ms:8.1f}  {module}")
+    print(f"import:  {import_ms:8.1f} ms (budget {args.import_budget_ms:.0f} ms)")
+    print(f"startup: {startup_ms:8.1f} ms (budget {args.startup_budget_ms:.0f} ms)")
+
+    over_budget = (
+        import_ms > args.import_budget_ms or startup_ms > args.startup_budget_ms
+    )
+    if over_budget:
+        print("over budget")
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 import asyncio
+from contextlib import asynccontextmanager
 from typing import Any, AsyncGenerator, Callable, Generator
 
 import pytest_asyncio
@@ -6,7 +7,8 @@ from core.config import settings
 from db.base import Base
 from db.session import async_session
 from fastapi import FastAPI
-from httpx import ASGITransport, AsyncClient
+from httpx import ASGITransport, AsyncClient, Response
+from observability.queries import QUERY_COUNT_HEADER
 from sqlalchemy.engine import create_engine
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -57,11 +59,53 @@ def override_get_session(db_session: AsyncSession) -> Callable:
 
 
 @pytest_asyncio.fixture(scope="function")
-def app_(override_get_session: Callable) -> FastAPI:
-    from api.dependencies.database import get_db_session
+def override_get_connection(db_session: AsyncSession) -> Callable:
+    async def override_get_connection_():
+        # the session's own connection, so reads see what the test flushed
+        yield await db_session.connection()
+
+    return override_get_connection_
+
+
+@pytest_asyncio.fixture(scope="function")
+def session_factory(db_session: AsyncSession) -> Callable:
+    """
+    A session factory that hands out the test's own session
+    """
+
+    @asynccontextmanager
+    async def session_factory_():
+        yield db_session
+
+    return session_factory_
+
+
+@pytest_asyncio.fixture(scope="function")
+def override_get_session_factory(session_factory: Callable) -> Callable:
+    def override_get_session_factory_():
+        return session_factory
+
+    return override_get_session_factory_
+
+
+@pytest_asyncio.fixture(scope="function")
+def app_(
+    override_get_session: Callable,
+    override_get_connection: Callable,
+    override_get_session_factory: Callable,
+) -> FastAPI:
+    from api.dependencies.database import (
+        get_db_session,
+        get_db_session_factory,
+        get_read_db_connection,
+        get_read_db_session,
+    )
     from main import app
 
     app.dependency_overrides[get_db_session] = override_get_session
+    app.dependency_overrides[get_read_db_session] = override_get_session
+    app.dependency_overrides[get_read_db_connection] = override_get_connection
+    app.dependency_overrides[get_db_session_factory] = override_get_session_factory
     return app
 
 
@@ -71,3 +115,21 @@ async def async_client(app_: FastAPI) -> AsyncGenerator[AsyncClient, Any]:
         transport=ASGITransport(app=app_), base_url="http://localhost"
     ) as client:
         yield client
+
+
+@pytest_asyncio.fixture(scope="function")
+def query_budget(async_client: AsyncClient) -> Callable:
+    """
+    Sends a request and fails the test when it took more SQL statements than
+    `budget`, e.g. `await query_budget(2, "GET", "/v1/blog")`
+    """
+
+    async def query_budget_(budget: int, method: str, url: str, **kwargs) -> Response:
+        response = await async_client.request(method, url, **kwargs)
+        count = int(response.headers[QUERY_COUNT_HEADER])
+        assert (
+            count <= budget
+        ), f"{method} {url} ran {count} statements, its budget is {budget}"
+        return response
+
+    return query_budget_
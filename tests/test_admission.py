@@ -0,0 +1,96 @@
+import asyncio
+
+import pytest
+from api.admission import (
+    READ_PRIORITY,
+    WRITE_PRIORITY,
+    AdmissionController,
+    AdmissionMiddleware,
+)
+from fastapi import FastAPI
+from httpx import ASGITransport, AsyncClient
+
+
+def make_controller(pool_wait: float = 0.0, **kwargs) -> AdmissionController:
+    options = dict(max_concurrency=1, max_queue=2, queue_timeout=1.0, max_pool_wait=0.5)
+    return AdmissionController(
+        **{**options, **kwargs}, pool_wait_estimate=lambda: pool_wait
+    )
+
+
+@pytest.mark.asyncio
+async def test_reads_are_admitted_before_writes():
+    controller = make_controller()
+    assert await controller.acquire(WRITE_PRIORITY) is None
+
+    admitted = []
+
+    async def request(name: str, priority: int):
+        assert await controller.acquire(priority) is None
+        admitted.append(name)
+        controller.release()
+
+    write = asyncio.create_task(request("write", WRITE_PRIORITY))
+    await asyncio.sleep(0)
+    read = asyncio.create_task(request("read", READ_PRIORITY))
+    await asyncio.sleep(0)
+    # both wait, a third one does not fit in the queue
+    assert await controller.acquire(READ_PRIORITY) == "queue_full"
+
+    controller.release()
+    await asyncio.gather(write, read)
+    assert admitted == ["read", "write"]
+    assert controller.status()["active"] == 0
+    assert controller.stats.queued == 2
+
+
+@pytest.mark.asyncio
+async def test_shedding_on_queue_timeout_and_pool_wait():
+    controller = make_controller(queue_timeout=0.01)
+    assert await controller.acquire(READ_PRIORITY) is None
+    assert await controller.acquire(READ_PRIORITY) == "queue_timeout"
+    assert controller.status()["waiting"] == 0
+    controller.release()
+    assert controller.active == 0
+
+    assert await make_controller(pool_wait=2.0).acquire(READ_PRIORITY) == "pool_wait"
+
+
+@pytest.mark.asyncio
+async def test_middleware_answers_503_when_shedding():
+    controller = make_controller(max_queue=0)
+    app = FastAPI()
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=controller,
+        exempt_paths={"/health"},
+        retry_after=3,
+    )
+    release = asyncio.Event()
+
+    @app.get("/slow")
+    async def slow():
+        await release.wait()
+        return "done"
+
+    @app.get("/health")
+    async def health():
+        return "OK"
+
+    async with AsyncClient(
+        transport=ASGITransport(app=app), base_url="http://localhost"
+    ) as client:
+        slow = asyncio.create_task(client.get("/slow"))
+        while controller.active == 0:
+            await asyncio.sleep(0.001)
+
+        response = await client.get("/slow")
+        assert response.status_code == 503
+        assert response.headers["retry-after"] == "3"
+        assert (await client.get("/health")).status_code == 200
+
+        release.set()
+        assert (await slow).status_code == 200
+
+    assert controller.status()["shed"] == {"queue_full": 1}
+    assert controller.active == 0
@@ -1,4 +1,13 @@
+import csv
+import io
+import json
+
 import pytest
+from core.config import settings
+from db.crud.base import BaseCrud
+from db.crud.blog_post import BlogPostCrud
+from db.crud.count import count_cache
+from db.crud.cursor import encode_cursor
 from httpx import AsyncClient, QueryParams
 from schemas.blog_post import InBlogPostSchema, OutBlogPostSchema
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -103,3 +112,502 @@ async def test_delete_a_blog_post(
 
     response = await async_client.get(f"/v1/blog/{post.id}")
     assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("total_posts,limit_param", [(10, 3), (7, 7), (0, 5)])
+async def test_list_blog_posts_with_cursor(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    total_posts: int,
+    limit_param: int,
+):
+    # the factory gives every post the same created_at, so pages are split on id
+    db_session.add_all(BlogPostFactory.build_batch(total_posts))
+    await db_session.flush()
+
+    seen_ids = []
+    cursor = ""
+    while cursor is not None:
+        response = await async_client.get(
+            "/v1/blog", params=QueryParams(limit=limit_param, cursor=cursor)
+        )
+        assert response.status_code == 200
+        response_data: dict = response.json()
+        assert response_data["total"] == total_posts
+        assert len(response_data["items"]) <= limit_param
+        seen_ids += [item["id"] for item in response_data["items"]]
+        cursor = response_data["next_cursor"]
+
+    assert len(seen_ids) == total_posts
+    assert seen_ids == sorted(seen_ids, reverse=True)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor",
+        # the id does not fit the integer column
+        encode_cursor(["2025-01-01T00:00:00", 999999999999999999999]),
+        # an integer is not a timestamp
+        encode_cursor([1, 2]),
+        encode_cursor(["2025-01-01T00:00:00"]),
+    ],
+)
+async def test_list_blog_posts_invalid_cursor(async_client: AsyncClient, cursor: str):
+    response = await async_client.get("/v1/blog", params={"cursor": cursor})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_blog_posts_limit_is_bounded(async_client: AsyncClient):
+    response = await async_client.get(
+        "/v1/blog", params={"limit": settings.PAGINATION_MAX_LIMIT + 1}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "count_strategy,total_posts,offset_param",
+    [
+        ("exact", 6, 0),
+        ("window", 6, 0),
+        ("window", 6, 4),
+        ("window", 6, 10),
+        ("window", 0, 0),
+        ("cached", 6, 0),
+    ],
+)
+async def test_list_blog_posts_count_strategies(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    count_strategy: str,
+    total_posts: int,
+    offset_param: int,
+):
+    count_cache.clear()
+    db_session.add_all(BlogPostFactory.build_batch(total_posts))
+    await db_session.flush()
+
+    response = await async_client.get(
+        "/v1/blog",
+        params=QueryParams(limit=5, offset=offset_param, count=count_strategy),
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == total_posts
+
+
+@pytest.mark.asyncio
+async def test_list_blog_posts_cached_count_is_reused(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+):
+    count_cache.clear()
+    db_session.add_all(BlogPostFactory.build_batch(3))
+    await db_session.flush()
+    response = await async_client.get("/v1/blog", params={"count": "cached"})
+    assert response.json()["total"] == 3
+
+    db_session.add_all(BlogPostFactory.build_batch(2))
+    await db_session.flush()
+    response = await async_client.get("/v1/blog", params={"count": "cached"})
+    assert response.json()["total"] == 3
+    assert len(response.json()["items"]) == 5
+    count_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_list_blog_posts_estimated_and_omitted_count(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+):
+    db_session.add_all(BlogPostFactory.build_batch(3))
+    await db_session.flush()
+
+    response = await async_client.get("/v1/blog", params={"count": "estimated"})
+    assert response.status_code == 200
+    assert isinstance(response.json()["total"], int)
+
+    response = await async_client.get("/v1/blog", params={"count": "none"})
+    assert response.status_code == 200
+    assert response.json()["total"] is None
+    assert len(response.json()["items"]) == 3
+
+
+@pytest.mark.asyncio
+async def test_retrieve_a_blog_post_conditional(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+):
+    post = BlogPostFactory.build()
+    db_session.add(post)
+    await db_session.flush()
+
+    response = await async_client.get(f"/v1/blog/{post.id}")
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+    assert response.headers["cache-control"]
+
+    response = await async_client.get(
+        f"/v1/blog/{post.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+    response = await async_client.get(
+        f"/v1/blog/{post.id}", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+    response = await async_client.get(
+        f"/v1/blog/{post.id}", headers={"If-None-Match": 'W/"stale"'}
+    )
+    assert response.status_code == 200
+
+    await async_client.patch(f"/v1/blog/{post.id}", json={"title": "changed"})
+    response = await async_client.get(
+        f"/v1/blog/{post.id}", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_list_blog_posts_conditional(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+):
+    db_session.add_all(BlogPostFactory.build_batch(3))
+    await db_session.flush()
+
+    response = await async_client.get("/v1/blog")
+    etag = response.headers["etag"]
+
+    response = await async_client.get("/v1/blog", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    db_session.add(BlogPostFactory.build())
+    await db_session.flush()
+    response = await async_client.get("/v1/blog", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == 4
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("params", [{"offset": 2}, {"cursor": ""}])
+async def test_list_blog_posts_fast_serialization(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch,
+    params: dict,
+):
+    db_session.add_all(BlogPostFactory.build_batch(6))
+    await db_session.flush()
+    params = {"limit": 3, **params}
+
+    response = await async_client.get("/v1/blog", params=params)
+    monkeypatch.setattr(settings, "CRUD_FAST_SERIALIZATION", True)
+    fast_response = await async_client.get("/v1/blog", params=params)
+
+    assert fast_response.status_code == 200
+    assert fast_response.headers["content-type"] == "application/json"
+    assert fast_response.json() == response.json()
+
+    etag = fast_response.headers["etag"]
+    fast_response = await async_client.get(
+        "/v1/blog", params=params, headers={"If-None-Match": etag}
+    )
+    assert fast_response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_blog_posts(async_client: AsyncClient):
+    items = [{"title": f"post {i}", "body": f"body {i}"} for i in range(5)]
+    response = await async_client.post("/v1/blog/bulk", json={"items": items})
+    assert response.status_code == 201
+    results = response.json()["items"]
+    assert [result["status"] for result in results] == [201] * 5
+    assert [result["item"]["title"] for result in results] == [
+        item["title"] for item in items
+    ]
+
+    response = await async_client.get("/v1/blog")
+    assert response.json()["total"] == 5
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_blog_posts_is_bounded(async_client: AsyncClient):
+    items = [{"title": "t", "body": "b"}] * (settings.BULK_MAX_ITEMS + 1)
+    response = await async_client.post("/v1/blog/bulk", json={"items": items})
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_blog_posts(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+):
+    posts = BlogPostFactory.build_batch(3)
+    db_session.add_all(posts)
+    await db_session.flush()
+    deleted_post = posts[2]
+    await async_client.delete(f"/v1/blog/{deleted_post.id}")
+
+    response = await async_client.patch(
+        "/v1/blog/bulk",
+        json={
+            "items": [
+                {"id": posts[0].id, "title": "first"},
+                {"id": posts[1].id, "body": "second"},
+                {"id": deleted_post.id, "title": "deleted"},
+                {"id": -1, "title": "missing"},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    results = response.json()["items"]
+    assert [result["status"] for result in results] == [200, 200, 404, 404]
+    assert results[0]["item"]["title"] == "first"
+    assert results[0]["item"]["body"] == posts[0].body
+    assert results[1]["item"]["title"] == posts[1].title
+    assert results[1]["item"]["body"] == "second"
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_blog_posts(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+):
+    posts = BlogPostFactory.build_batch(3)
+    db_session.add_all(posts)
+    await db_session.flush()
+
+    response = await async_client.request(
+        "DELETE", "/v1/blog/bulk", json={"ids": [posts[0].id, posts[1].id, -1]}
+    )
+    assert response.status_code == 200
+    assert [result["status"] for result in response.json()["items"]] == [
+        204,
+        204,
+        404,
+    ]
+
+    response = await async_client.request(
+        "DELETE", "/v1/blog/bulk", json={"ids": [posts[0].id]}
+    )
+    assert response.json()["items"][0]["status"] == 404
+
+    response = await async_client.get("/v1/blog")
+    assert [item["id"] for item in response.json()["items"]] == [posts[2].id]
+
+
+@pytest.mark.asyncio
+async def test_bulk_requests_reject_duplicate_ids(async_client: AsyncClient):
+    response = await async_client.patch(
+        "/v1/blog/bulk",
+        json={"items": [{"id": 1, "title": "first"}, {"id": 1, "title": "second"}]},
+    )
+    assert response.status_code == 422
+
+    response = await async_client.request(
+        "DELETE", "/v1/blog/bulk", json={"ids": [1, 2, 1]}
+    )
+    assert response.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_update_a_deleted_blog_post(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+):
+    post = BlogPostFactory.build()
+    db_session.add(post)
+    await db_session.flush()
+    await async_client.delete(f"/v1/blog/{post.id}")
+
+    response = await async_client.patch(f"/v1/blog/{post.id}", json={"title": "t"})
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+async def test_export_blog_posts(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+    monkeypatch: pytest.MonkeyPatch,
+    export_format: str,
+):
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 2)
+    posts = BlogPostFactory.build_batch(5)
+    db_session.add_all(posts)
+    await db_session.flush()
+    await async_client.delete(f"/v1/blog/{posts[0].id}")
+
+    response = await async_client.get(
+        "/v1/blog/export", params={"format": export_format}
+    )
+    assert response.status_code == 200
+
+    if export_format == "ndjson":
+        assert response.headers["content-type"] == "application/x-ndjson"
+        rows = [json.loads(line) for line in response.text.splitlines()]
+    else:
+        assert response.headers["content-type"].startswith("text/csv")
+        rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == [post.id for post in posts[1:]]
+    assert set(rows[0]) == set(OutBlogPostSchema.model_fields)
+
+
+@pytest.mark.asyncio
+async def test_import_blog_posts_ndjson(
+    async_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 2)
+    lines = [
+        json.dumps({"title": "first", "body": "body"}),
+        "{not json",
+        json.dumps({"title": "no body"}),
+        "",
+        json.dumps({"title": "second", "body": "body"}),
+        json.dumps({"title": "third", "body": "body"}),
+    ]
+    response = await async_client.post(
+        "/v1/blog/import", content="\n".join(lines).encode()
+    )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 3
+    assert report["rejected"] == 2
+    assert [error["record"] for error in report["errors"]] == [2, 3]
+
+    response = await async_client.get("/v1/blog")
+    assert {item["title"] for item in response.json()["items"]} == {
+        "first",
+        "second",
+        "third",
+    }
+
+
+@pytest.mark.asyncio
+async def test_import_blog_posts_csv(async_client: AsyncClient):
+    content = 'title,body\nfirst,"multi\nline, with ""quotes"""\nbroken\nsecond,body\n'
+    response = await async_client.post(
+        "/v1/blog/import", params={"format": "csv"}, content=content.encode()
+    )
+    report = response.json()
+    assert (report["imported"], report["rejected"]) == (2, 1)
+
+    response = await async_client.get("/v1/blog")
+    bodies = {item["title"]: item["body"] for item in response.json()["items"]}
+    assert bodies == {"first": 'multi\nline, with "quotes"', "second": "body"}
+
+
+@pytest.mark.asyncio
+async def test_import_blog_posts_keeps_going_after_a_failed_chunk(
+    async_client: AsyncClient,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    monkeypatch.setattr(settings, "IMPORT_CHUNK_SIZE", 1)
+    lines = [
+        json.dumps({"title": "first", "body": "body"}),
+        # Postgres text columns cannot hold NUL characters
+        json.dumps({"title": "nul \u0000", "body": "body"}),
+        json.dumps({"title": "second", "body": "body"}),
+    ]
+    response = await async_client.post(
+        "/v1/blog/import", content="\n".join(lines).encode()
+    )
+    report = response.json()
+    assert (report["imported"], report["rejected"]) == (2, 1)
+    assert report["errors"][0]["record"] == 2
+
+    response = await async_client.get("/v1/blog")
+    assert response.json()["total"] == 2
+
+
+@pytest.mark.asyncio
+async def test_search_blog_posts(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+):
+    best = BlogPostFactory.build(title="Async Python", body="python python python")
+    good = BlogPostFactory.build(title="Python tips", body="a few tips")
+    deleted = BlogPostFactory.build(title="Python", body="deleted python post")
+    other = BlogPostFactory.build(title="Gardening", body="tomatoes")
+    db_session.add_all([best, good, deleted, other])
+    await db_session.flush()
+    await async_client.delete(f"/v1/blog/{deleted.id}")
+
+    response = await async_client.get("/v1/blog/search", params={"q": "python"})
+    assert response.status_code == 200
+    response_data = response.json()
+    assert [item["id"] for item in response_data["items"]] == [best.id, good.id]
+    assert response_data["total"] is None
+
+    seen_ids = []
+    cursor = ""
+    while cursor is not None:
+        response = await async_client.get(
+            "/v1/blog/search", params={"q": "python", "limit": 1, "cursor": cursor}
+        )
+        seen_ids += [item["id"] for item in response.json()["items"]]
+        cursor = response.json()["next_cursor"]
+    assert seen_ids == [best.id, good.id]
+
+    response = await async_client.get("/v1/blog/search", params={"q": "tomato"})
+    assert [item["id"] for item in response.json()["items"]] == [other.id]
+
+
+@pytest.mark.asyncio
+async def test_search_pages_through_equal_ranks(
+    async_client: AsyncClient,
+    db_session: AsyncSession,
+):
+    posts = BlogPostFactory.build_batch(7, title="Python", body="python")
+    db_session.add_all(posts)
+    await db_session.flush()
+
+    seen_ids = []
+    cursor = ""
+    while cursor is not None:
+        response = await async_client.get(
+            "/v1/blog/search", params={"q": "python", "limit": 2, "cursor": cursor}
+        )
+        seen_ids += [item["id"] for item in response.json()["items"]]
+        cursor = response.json()["next_cursor"]
+    assert seen_ids == sorted((post.id for post in posts), reverse=True)
+
+
+@pytest.mark.asyncio
+async def test_search_needs_a_searchable_crud_class(db_session: AsyncSession):
+    with pytest.raises(TypeError):
+
+        class NoVectorCrud(BaseCrud):
+            searchable = True
+
+    class UnsearchableCrud(BlogPostCrud):
+        searchable = False
+
+    with pytest.raises(TypeError):
+        await UnsearchableCrud(db_session).search("python", 10)
+
+
+@pytest.mark.asyncio
+async def test_crud_reads_on_a_connection(db_session: AsyncSession):
+    posts = BlogPostFactory.build_batch(3)
+    db_session.add_all(posts)
+    await db_session.flush()
+
+    session_crud = BlogPostCrud(db_session)
+    connection_crud = BlogPostCrud(await db_session.connection())
+    assert await connection_crud.get_by_id(posts[0].id) == (
+        await session_crud.get_by_id(posts[0].id)
+    )
+    assert await connection_crud.get_paginated_list(2, 1) == (
+        await session_crud.get_paginated_list(2, 1)
+    )
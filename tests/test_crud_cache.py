@@ -0,0 +1,132 @@
+from typing import Optional
+
+import pytest
+from core.config import settings
+from db.crud.blog_post import BlogPostCrud
+from db.crud.cache import CacheBackend, LRUCache
+from httpx import AsyncClient
+from schemas.blog_post import UpdateBlogPostSchema
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .factory.blog_post_factory import BlogPostFactory
+
+
+class CachedBlogPostCrud(BlogPostCrud):
+    def __init__(self, db_session: AsyncSession, cache: CacheBackend):
+        super().__init__(db_session)
+        self._cache = cache
+
+    @property
+    def cache(self) -> Optional[CacheBackend]:
+        return self._cache
+
+
+@pytest.mark.asyncio
+async def test_lru_cache_evicts_and_expires():
+    cache = LRUCache(max_entries=2)
+    await cache.set("a", 1, ttl=60)
+    await cache.set("b", 2, ttl=60)
+    assert await cache.get("a") == 1
+    await cache.set("c", 3, ttl=60)  # "b" is the least recently used now
+    assert await cache.get("b") is None
+    await cache.set("d", 4, ttl=-1)
+    assert await cache.get("d") is None
+
+    assert cache.stats.hits == 1
+    assert cache.stats.misses == 2
+    assert cache.stats.evictions == 2
+    assert cache.stats.expirations == 1
+
+
+@pytest.mark.asyncio
+async def test_get_by_id_is_cached_and_invalidated_on_update(db_session: AsyncSession):
+    post = BlogPostFactory.build()
+    db_session.add(post)
+    await db_session.flush()
+    cache = LRUCache(max_entries=100)
+    crud = CachedBlogPostCrud(db_session, cache)
+
+    first = await crud.get_by_id(post.id)
+    first.title = "changed by the caller"
+    second = await crud.get_by_id(post.id)
+    assert second.title == post.title
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    await crud.update_by_id(post.id, UpdateBlogPostSchema(title="new title"))
+    # uncommitted writes are read straight from the session
+    assert (await crud.get_by_id(post.id)).title == "new title"
+    assert (cache.stats.hits, cache.stats.misses) == (1, 1)
+
+    await crud.commit_session()
+    assert (await crud.get_by_id(post.id)).title == "new title"
+    assert (await crud.get_by_id(post.id)).title == "new title"
+    assert (cache.stats.hits, cache.stats.misses) == (2, 2)
+
+
+class RacingCache(LRUCache):
+    """
+    Runs `before_set` just before the next store, as if another request wrote
+    while a read was between its query and its cache fill
+    """
+
+    before_set = None
+
+    async def set(self, key, value, ttl):
+        if self.before_set is not None:
+            before_set, self.before_set = self.before_set, None
+            await before_set()
+        await super().set(key, value, ttl)
+
+
+@pytest.mark.asyncio
+async def test_reads_racing_a_write_do_not_cache_stale_rows(db_session: AsyncSession):
+    post = BlogPostFactory.build(title="old title")
+    db_session.add(post)
+    await db_session.flush()
+    cache = RacingCache(max_entries=100)
+    crud = CachedBlogPostCrud(db_session, cache)
+
+    async def update():
+        writer = CachedBlogPostCrud(db_session, cache)
+        await writer.update_by_id(post.id, UpdateBlogPostSchema(title="new title"))
+        await writer.commit_session()
+
+    cache.before_set = update
+    assert (await crud.get_by_id(post.id)).title == "old title"
+    assert (await crud.get_by_id(post.id)).title == "new title"
+
+
+@pytest.mark.asyncio
+async def test_list_pages_are_invalidated_by_writes(db_session: AsyncSession):
+    db_session.add_all(BlogPostFactory.build_batch(3))
+    await db_session.flush()
+    cache = LRUCache(max_entries=100)
+    crud = CachedBlogPostCrud(db_session, cache)
+
+    assert (await crud.get_paginated_list(10, 0)).total == 3
+    assert (await crud.get_paginated_list(10, 0)).total == 3
+    assert cache.stats.hits == 1
+
+    post = BlogPostFactory.build()
+    db_session.add(post)
+    await db_session.flush()
+    # written behind the CRUD's back, so the cached page is still served
+    assert (await crud.get_paginated_list(10, 0)).total == 3
+
+    await crud.delete_by_id(post.id)
+    await crud.commit_session()
+    await crud.delete_by_id((await crud.get_paginated_list(10, 0)).items[0].id)
+    await crud.commit_session()
+    assert (await crud.get_paginated_list(10, 0)).total == 2
+
+
+@pytest.mark.asyncio
+async def test_cache_diagnostics_require_credentials(async_client: AsyncClient):
+    response = await async_client.get("/diagnostics/cache")
+    assert response.status_code == 401
+
+    response = await async_client.get(
+        "/diagnostics/cache", auth=(settings.DOCS_USERNAME, settings.DOCS_PASSWORD)
+    )
+    assert response.status_code == 200
+    assert response.json() == {"enabled": False}
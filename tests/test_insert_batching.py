@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+from db.crud.batching import InsertBatcher
+from db.crud.blog_post import BlogPostCrud
+from db.session import async_session
+from httpx import AsyncClient
+from observability.queries import track_queries
+from schemas.blog_post import InBlogPostSchema
+
+
+def make_batcher(**kwargs) -> InsertBatcher:
+    options = dict(window=0.01, max_rows=100)
+    return InsertBatcher(BlogPostCrud, **{**options, **kwargs})
+
+
+def post(i: int, title: str = "batched") -> InBlogPostSchema:
+    return InBlogPostSchema(title=f"{title} {i}", body="body")
+
+
+@pytest.mark.asyncio
+async def test_concurrent_creates_share_one_insert(session_factory):
+    batcher = make_batcher()
+    with track_queries() as stats:
+        created = await asyncio.gather(
+            *(batcher.create(post(i), session_factory) for i in range(5))
+        )
+    assert [entry.title for entry in created] == [f"batched {i}" for i in range(5)]
+    assert len({entry.id for entry in created}) == 5
+    # a savepoint, the INSERT and its release
+    assert stats.count == 3
+    assert batcher.stats.as_dict() == {"batches": 1, "rows": 5, "row_by_row": 0}
+
+
+@pytest.mark.asyncio
+async def test_batches_are_cut_at_max_rows():
+    batcher = make_batcher(window=60, max_rows=2)
+    # the batches flush concurrently, each on a session of its own (only flushed
+    # in the test environment, so closing them rolls the rows back)
+    created = await asyncio.gather(
+        *(batcher.create(post(i), async_session) for i in range(4))
+    )
+    assert len(created) == 4
+    assert batcher.stats.batches == 2
+
+
+@pytest.mark.asyncio
+async def test_a_failing_row_only_fails_its_own_request(session_factory):
+    batcher = make_batcher()
+    results = await asyncio.gather(
+        batcher.create(post(0), session_factory),
+        # text values cannot contain NUL characters
+        batcher.create(post(1, title="\x00"), session_factory),
+        batcher.create(post(2), session_factory),
+        return_exceptions=True,
+    )
+    assert results[0].title == "batched 0"
+    assert isinstance(results[1], Exception)
+    assert results[2].title == "batched 2"
+    assert batcher.stats.row_by_row == 1
+
+
+@pytest.mark.asyncio
+async def test_create_endpoint_with_batching(async_client: AsyncClient, monkeypatch):
+    monkeypatch.setattr("core.config.settings.CRUD_INSERT_BATCHING_ENABLED", True)
+    responses = await asyncio.gather(
+        *(
+            async_client.post("/v1/blog", json={"title": f"post {i}", "body": "b"})
+            for i in range(3)
+        )
+    )
+    assert [response.status_code for response in responses] == [201] * 3
+    assert [response.json()["title"] for response in responses] == [
+        f"post {i}" for i in range(3)
+    ]
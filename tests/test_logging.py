@@ -0,0 +1,71 @@
+import logging
+import queue
+
+from logging_setup import (
+    ContextQueueListener,
+    DeferredFormatQueueHandler,
+    RateLimitFilter,
+    SamplingFilter,
+)
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.lines = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.lines.append(self.format(record))
+
+
+def make_logger(name: str, *handlers: logging.Handler) -> logging.Logger:
+    logger = logging.getLogger(name)
+    logger.handlers = list(handlers)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+def test_sampling_filter_keeps_warnings():
+    handler = ListHandler()
+    logger = make_logger("tests.sampled", handler)
+    sampling = SamplingFilter(0.0)
+    logger.addFilter(sampling)
+
+    for _ in range(10):
+        logger.info("dropped")
+    logger.warning("kept")
+    assert handler.lines == ["kept"]
+    assert sampling.dropped == 10
+
+
+def test_rate_limit_filter_allows_bursts():
+    handler = ListHandler()
+    logger = make_logger("tests.rate_limited", handler)
+    rate_limit = RateLimitFilter(3)
+    logger.addFilter(rate_limit)
+
+    for i in range(10):
+        logger.info("message %d", i)
+    logger.error("error")
+    assert handler.lines == ["message 0", "message 1", "message 2", "error"]
+    assert rate_limit.dropped == 7
+
+
+def test_queue_handler_formats_in_the_listener():
+    target = ListHandler()
+    log_queue = queue.SimpleQueue()
+    listener = ContextQueueListener(log_queue, target, respect_handler_level=True)
+    listener.start()
+    logger = make_logger("tests.queued", DeferredFormatQueueHandler(log_queue))
+
+    logger.info("hello %s", "world")
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("failed")
+    listener.stop()
+
+    assert target.lines[0] == "hello world"
+    assert target.lines[1].startswith("failed\nTraceback")
+    assert "ValueError: boom" in target.lines[1]
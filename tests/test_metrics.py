@@ -0,0 +1,103 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from core.config import settings
+from db.session import async_session
+from httpx import AsyncClient
+from observability.instrumentation import statement_label
+from prometheus_client import CONTENT_TYPE_LATEST
+from prometheus_client.parser import text_string_to_metric_families
+from sqlalchemy import text
+
+APP_DIR = Path(__file__).parent.parent / "app"
+
+WORKER = """
+import os
+from observability import instrumentation
+
+instrumentation.http_requests.labels("GET", "/a", "200").inc()
+instrumentation.http_requests_in_flight.inc()
+print(os.getpid())
+"""
+
+SCRAPE = """
+import sys
+from observability import instrumentation
+from prometheus_client import multiprocess
+
+multiprocess.mark_process_dead(int(sys.argv[1]))
+sys.stdout.write(instrumentation.metrics_text().decode())
+"""
+
+
+def parse(output: str) -> dict:
+    """
+    :return: sample values by name and sorted labels
+    """
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(output)
+        for sample in family.samples
+    }
+
+
+def test_statement_label():
+    assert statement_label('SELECT a.id FROM "blog_post" AS a') == "SELECT blog_post"
+    assert statement_label("INSERT INTO test_blog_post (id) VALUES (1)") == (
+        "INSERT test_blog_post"
+    )
+    assert statement_label("select 1") == "SELECT"
+
+
+def test_workers_are_added_up(tmp_path):
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+
+    def run(code: str, *args: str) -> str:
+        return subprocess.run(
+            [sys.executable, "-c", code, *args],
+            cwd=APP_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+
+    run(WORKER)
+    dead_pid = run(WORKER).strip()
+    samples = parse(run(SCRAPE, dead_pid))
+
+    labels = (("method", "GET"), ("route", "/a"), ("status", "200"))
+    # counters of exited workers are kept, live gauges only count running ones
+    assert samples[("http_requests_total", labels)] == 2
+    assert samples[("http_requests_in_flight", ())] == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint(async_client: AsyncClient):
+    credentials = (settings.DOCS_USERNAME, settings.DOCS_PASSWORD)
+    response = await async_client.get("/metrics")
+    assert response.status_code == 401
+
+    await async_client.get("/v1/blog/999999")
+    async with async_session() as session:
+        await session.execute(text("SELECT 1"))
+
+    response = await async_client.get("/metrics", auth=credentials)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == CONTENT_TYPE_LATEST
+    samples = parse(response.text)
+    route = (("method", "GET"), ("route", "/v1/blog/{post_id}"), ("status", "404"))
+    assert samples[("http_requests_total", route)] >= 1
+    assert any(
+        name == "http_requests_total" and ("route", "/metrics") in labels
+        for name, labels in samples
+    )
+    statement = (("engine", "primary"), ("statement", "SELECT"))
+    assert samples[("db_statement_duration_seconds_count", statement)] >= 1
+    assert (
+        "db_pool_connections",
+        (("pool", "primary"), ("state", "idle")),
+    ) in samples
@@ -0,0 +1,120 @@
+import pytest
+from api.dependencies.database import get_read_db_connection
+from core.config import DbSessionScopeEnum, EnvironmentEnum, settings
+from db.connections import OperationConnection
+from db.crud.blog_post import BlogPostCrud
+from db.pool import (
+    RECENT_WAIT_WEIGHT,
+    InstrumentedAsyncAdaptedQueuePool,
+    PoolStats,
+    estimated_checkout_wait,
+    pool_status,
+)
+from db.session import async_session, engine
+from fastapi import Request
+from httpx import AsyncClient
+from schemas.blog_post import InBlogPostSchema
+from sqlalchemy import exc
+from sqlalchemy.ext.asyncio import create_async_engine
+
+
+def test_wait_histogram_is_cumulative():
+    stats = PoolStats()
+    for seconds in (0.0005, 0.003, 0.003, 20):
+        stats.observe_wait(seconds)
+
+    histogram = stats.wait_histogram()
+    assert histogram["0.001"] == 1
+    assert histogram["0.005"] == 3
+    assert histogram["10"] == 3
+    assert histogram["+Inf"] == 4
+
+
+@pytest.mark.asyncio
+async def test_pool_counts_checkouts_and_timeouts():
+    engine = create_async_engine(
+        str(settings.DATABASE_URL),
+        poolclass=InstrumentedAsyncAdaptedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+    )
+    try:
+        async with engine.connect():
+            status = pool_status(engine)
+            assert status["checked_out"] == 1
+            assert status["checkouts"] == 1
+
+            with pytest.raises(exc.TimeoutError):
+                async with engine.connect():
+                    pass
+            # exhausted, so the next checkout is expected to wait like the recent ones
+            assert estimated_checkout_wait(engine) >= 0.05 * RECENT_WAIT_WEIGHT
+
+        assert estimated_checkout_wait(engine) == 0
+        status = pool_status(engine)
+        assert status["checked_out"] == 0
+        assert status["idle"] == 1
+        assert status["timeouts"] == 1
+        assert status["wait_seconds_histogram"]["+Inf"] == 2
+
+        # the numbers survive the pool being swapped out
+        await engine.dispose()
+        assert pool_status(engine)["timeouts"] == 1
+    finally:
+        await engine.dispose()
+
+
+@pytest.mark.asyncio
+async def test_pool_diagnostics(async_client: AsyncClient):
+    response = await async_client.get("/diagnostics/pool")
+    assert response.status_code == 401
+
+    response = await async_client.get(
+        "/diagnostics/pool", auth=(settings.DOCS_USERNAME, settings.DOCS_PASSWORD)
+    )
+    assert response.status_code == 200
+    primary = response.json()["pools"]["primary"]
+    assert primary["size"] == settings.DB_POOL_SIZE
+    assert {"checked_out", "idle", "overflow", "timeouts"} <= primary.keys()
+
+
+@pytest.mark.asyncio
+async def test_operation_scope_releases_connections_after_reads(monkeypatch):
+    monkeypatch.setattr(settings, "DB_SESSION_SCOPE", DbSessionScopeEnum.OPERATION)
+    # outside of the test environment, on a session of its own that nothing commits
+    monkeypatch.setattr(settings, "ENVIRONMENT", EnvironmentEnum.DEVELOP)
+    checked_out = pool_status(engine)["checked_out"]
+
+    async with async_session() as session:
+        crud = BlogPostCrud(session)
+        await crud.get_paginated_list(5, 0)
+        assert not session.in_transaction()
+        assert pool_status(engine)["checked_out"] == checked_out
+
+        # uncommitted writes keep their connection until commit_session
+        await crud.create(InBlogPostSchema(title="title", body="body"))
+        await crud.count()
+        assert session.in_transaction()
+        assert pool_status(engine)["checked_out"] == checked_out + 1
+        await session.rollback()
+
+
+@pytest.mark.asyncio
+async def test_operation_scope_releases_read_connections(monkeypatch):
+    monkeypatch.setattr(settings, "DB_SESSION_SCOPE", DbSessionScopeEnum.OPERATION)
+    monkeypatch.setattr(settings, "ENVIRONMENT", EnvironmentEnum.DEVELOP)
+    checked_out = pool_status(engine)["checked_out"]
+
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    dependency = get_read_db_connection(request)
+    db = await anext(dependency)
+    assert isinstance(db, OperationConnection)
+    crud = BlogPostCrud(db)
+    await crud.get_paginated_list(5, 0)
+    # the response is serialized before the dependency is torn down
+    assert pool_status(engine)["checked_out"] == checked_out
+    # later reads check a connection out again
+    assert (await crud.count()) == (await crud.get_paginated_list(5, 0)).total
+    assert pool_status(engine)["checked_out"] == checked_out
+    await dependency.aclose()
@@ -0,0 +1,67 @@
+import datetime
+
+import pytest
+from db.crud.blog_post import BlogPostCrud
+from db.purge import (
+    PURGE_ADVISORY_LOCK_KEY,
+    purge_all,
+    purge_soft_deleted,
+    purgeable_crud_classes,
+)
+from db.session import async_session, engine
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .factory.blog_post_factory import BlogPostFactory
+
+
+def test_one_crud_class_per_table():
+    assert purgeable_crud_classes() == [BlogPostCrud]
+
+
+def test_table_must_be_a_class_attribute():
+    with pytest.raises(TypeError):
+
+        class PropertyTableCrud(BlogPostCrud):
+            @property
+            def _table(self):
+                return BlogPostCrud._table
+
+
+@pytest.mark.asyncio
+async def test_purge_soft_deleted(db_session: AsyncSession, session_factory):
+    now = datetime.datetime.now()
+    expired = BlogPostFactory.build_batch(3, deleted_at=now - datetime.timedelta(40))
+    recent = BlogPostFactory.build(deleted_at=now - datetime.timedelta(1))
+    active = BlogPostFactory.build()
+    db_session.add_all([*expired, recent, active])
+    await db_session.flush()
+
+    report = await purge_soft_deleted(
+        BlogPostCrud,
+        session_factory,
+        retention=datetime.timedelta(days=30),
+        batch_size=2,
+        pause=0,
+    )
+    assert (report.purged, report.batches) == (3, 2)
+    assert report.table == BlogPostCrud._table.__tablename__
+
+    db_session.expunge_all()
+    table = BlogPostCrud._table
+    remaining = set(await db_session.scalars(select(table.id)))
+    assert {recent.id, active.id} <= remaining
+    assert not remaining & {post.id for post in expired}
+
+
+@pytest.mark.asyncio
+async def test_purge_skips_while_another_process_holds_the_lock():
+    async with engine.connect() as connection:
+        await connection.execute(
+            text("SELECT pg_advisory_lock(:key)"), {"key": PURGE_ADVISORY_LOCK_KEY}
+        )
+        assert await purge_all(engine, async_session) is None
+        await connection.execute(
+            text("SELECT pg_advisory_unlock(:key)"), {"key": PURGE_ADVISORY_LOCK_KEY}
+        )
+        await connection.rollback()
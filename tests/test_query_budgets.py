@@ -0,0 +1,48 @@
+import pytest
+from observability.queries import QUERY_TIME_HEADER, fingerprint, track_queries
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .factory.blog_post_factory import BlogPostFactory
+
+
+def test_fingerprint_ignores_values():
+    first = fingerprint("SELECT * FROM t WHERE id IN (1, 2, 3) AND title = 'a'")
+    second = fingerprint("SELECT *  FROM t\nWHERE id IN (4) AND title = 'it''s'")
+    assert first == second
+    assert first[1] == "SELECT * FROM t WHERE id IN (?) AND title = ?"
+    assert fingerprint("SELECT * FROM t2 WHERE id = %(id_1)s")[1].endswith("id = ?")
+
+
+@pytest.mark.asyncio
+async def test_track_queries(db_session: AsyncSession):
+    with track_queries() as stats:
+        await db_session.execute(text("SELECT 1"))
+        await db_session.execute(text("SELECT 2"))
+    assert stats.count == 2
+    assert stats.seconds > 0
+
+
+@pytest.mark.asyncio
+async def test_slow_queries_are_logged(db_session: AsyncSession, monkeypatch, caplog):
+    monkeypatch.setattr("core.config.settings.DB_SLOW_QUERY_MS", 0.000001)
+    await db_session.execute(text("SELECT 42"))
+    assert "Slow query" in caplog.text
+    assert "SELECT ?" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_blog_post_query_budgets(query_budget, db_session: AsyncSession):
+    posts = BlogPostFactory.build_batch(3)
+    db_session.add_all(posts)
+    await db_session.flush()
+    post_id = posts[0].id
+
+    # the page and its total come from a single windowed query
+    response = await query_budget(1, "GET", "/v1/blog")
+    assert float(response.headers[QUERY_TIME_HEADER]) > 0
+    await query_budget(1, "GET", f"/v1/blog/{post_id}")
+    await query_budget(1, "GET", "/v1/blog/search", params={"q": "post"})
+    await query_budget(1, "POST", "/v1/blog", json={"title": "a", "body": "b"})
+    await query_budget(1, "PATCH", f"/v1/blog/{post_id}", json={"title": "c"})
+    await query_budget(1, "DELETE", f"/v1/blog/{post_id}")
@@ -0,0 +1,90 @@
+import datetime
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterator
+
+import pytest
+from db.crud.blog_post import BlogPostCrud
+from db.crud.count import CountStrategy
+from db.session import engine
+from schemas.blog_post import UpdateBlogPostSchema
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .factory.blog_post_factory import BlogPostFactory
+
+
+@contextmanager
+def captured_statements() -> Iterator[list[tuple[str, dict]]]:
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def plan_nodes(plan: dict) -> Iterator[dict]:
+    yield plan
+    for child in plan.get("Plans", []):
+        yield from plan_nodes(child)
+
+
+async def explain(db_session: AsyncSession, statement: str, parameters) -> dict:
+    connection = await db_session.connection()
+    result = await connection.exec_driver_sql(
+        f"EXPLAIN (FORMAT JSON) {statement}", parameters
+    )
+    return result.scalar()[0]["Plan"]
+
+
+async def read_next_page(crud: BlogPostCrud):
+    page = await crud.get_paginated_list(5, 0, cursor="")
+    await crud.get_paginated_list(5, 0, cursor=page.next_cursor)
+
+
+HOT_QUERIES: dict[str, Callable[[BlogPostCrud, int], Awaitable]] = {
+    "get_by_id": lambda crud, post_id: crud.get_by_id(post_id),
+    "get_version_by_id": lambda crud, post_id: crud.get_version_by_id(post_id),
+    "page": lambda crud, _: crud.get_paginated_list(
+        5, 10, count_strategy=CountStrategy.NONE
+    ),
+    "page_with_window_count": lambda crud, _: crud.get_paginated_list(
+        5, 10, count_strategy=CountStrategy.WINDOW
+    ),
+    "exact_count": lambda crud, _: crud.count(),
+    "cursor_pages": lambda crud, _: read_next_page(crud),
+    "search": lambda crud, _: crud.search("blog", 5),
+    "update": lambda crud, post_id: crud.update_and_get_by_id(
+        post_id, UpdateBlogPostSchema(title="t")
+    ),
+    "delete": lambda crud, post_id: crud.delete_by_id(post_id),
+    "purge": lambda crud, _: crud.purge_deleted(datetime.timedelta(days=30), 10),
+}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("query_name", HOT_QUERIES.keys())
+async def test_hot_queries_use_indexes(db_session: AsyncSession, query_name: str):
+    posts = BlogPostFactory.build_batch(30)
+    db_session.add_all(posts)
+    await db_session.flush()
+    connection = await db_session.connection()
+    # make the planner pick a seq scan or a sort only when no index can serve the query
+    await connection.exec_driver_sql("SET LOCAL enable_seqscan = off")
+    await connection.exec_driver_sql("SET LOCAL enable_sort = off")
+
+    crud = BlogPostCrud(db_session)
+    with captured_statements() as statements:
+        await HOT_QUERIES[query_name](crud, posts[0].id)
+    assert statements
+
+    for statement, parameters in statements:
+        plan = await explain(db_session, statement, parameters)
+        node_types = [node["Node Type"] for node in plan_nodes(plan)]
+        assert "Seq Scan" not in node_types, (statement, node_types)
+        if query_name != "search":  # ranked results have to be sorted
+            assert "Sort" not in node_types, (statement, node_types)
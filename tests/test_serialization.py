@@ -0,0 +1,31 @@
+from datetime import datetime
+
+import pytest
+from pydantic import BaseModel, Field
+from schemas.blog_post import OutBlogPostSchema
+from schemas.serialization import page_adapter_of
+
+
+def test_page_adapter_matches_the_model():
+    item = OutBlogPostSchema(
+        id=1, title="t", body="b", created_at=datetime.now(), updated_at=datetime.now()
+    )
+    row = {**item.model_dump(), "total_count__": 10}
+
+    body = page_adapter_of(OutBlogPostSchema).dump_json(
+        {"total": 10, "items": [row], "next_cursor": None}
+    )
+    assert (
+        body
+        == (
+            '{"total":10,"items":[%s],"next_cursor":null}' % item.model_dump_json()
+        ).encode()
+    )
+
+
+def test_page_adapter_rejects_custom_serialization():
+    class Aliased(BaseModel):
+        value: int = Field(serialization_alias="v")
+
+    with pytest.raises(TypeError):
+        page_adapter_of(Aliased)
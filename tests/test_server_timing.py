@@ -0,0 +1,39 @@
+import pytest
+from httpx import AsyncClient
+from observability.queries import QUERY_COUNT_HEADER
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .factory.blog_post_factory import BlogPostFactory
+
+
+def parse_server_timing(header: str) -> dict[str, float]:
+    phases = {}
+    for metric in header.split(","):
+        name, duration = metric.strip().split(";dur=")
+        phases[name] = float(duration)
+    return phases
+
+
+@pytest.mark.asyncio
+async def test_server_timing_phases(
+    async_client: AsyncClient, db_session: AsyncSession
+):
+    post = BlogPostFactory.build()
+    db_session.add(post)
+    await db_session.flush()
+
+    response = await async_client.get(f"/v1/blog/{post.id}")
+    assert response.status_code == 200
+    phases = parse_server_timing(response.headers["server-timing"])
+    assert set(phases) == {"db", "validate", "deps", "serialize", "total"}
+    assert phases["db"] > 0
+    assert phases["total"] >= phases["db"] + phases["validate"]
+    # shares the statements tracked for X-DB-Query-Count
+    assert response.headers[QUERY_COUNT_HEADER] == "1"
+
+
+@pytest.mark.asyncio
+async def test_server_timing_without_a_timed_route(async_client: AsyncClient):
+    response = await async_client.get("/health")
+    phases = parse_server_timing(response.headers["server-timing"])
+    assert set(phases) == {"db", "total"}
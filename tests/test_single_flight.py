@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+from db.crud.blog_post import BlogPostCrud
+from db.crud.single_flight import SingleFlight
+from db.session import async_session
+from fastapi import HTTPException
+from observability.queries import track_queries
+
+from .factory.blog_post_factory import BlogPostFactory
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_result():
+    single_flight = SingleFlight()
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return len(calls)
+
+    results = await asyncio.gather(*(single_flight.run("key", call) for _ in range(3)))
+    assert results == [1, 1, 1]
+    assert single_flight.stats.as_dict() == {"leaders": 1, "coalesced": 2}
+    assert len(single_flight) == 0
+
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(single_flight.run("key", fail) for _ in range(2)), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_followers_run_the_call_when_the_leader_is_cancelled():
+    single_flight = SingleFlight()
+
+    async def call():
+        await asyncio.sleep(0.01)
+        return "result"
+
+    leader = asyncio.create_task(single_flight.run("key", call))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(single_flight.run("key", call))
+    await asyncio.sleep(0)
+    leader.cancel()
+    assert await follower == "result"
+
+
+@pytest.mark.asyncio
+async def test_crud_reads_are_coalesced(db_session, monkeypatch):
+    single_flight = SingleFlight()
+    monkeypatch.setattr("db.crud.base.single_flight", single_flight)
+
+    async def read_page():
+        async with async_session() as session:
+            return await BlogPostCrud(session).get_paginated_list(limit=10, offset=0)
+
+    async def read_missing():
+        async with async_session() as session:
+            with pytest.raises(HTTPException):
+                await BlogPostCrud(session).get_by_id(0)
+
+    with track_queries() as stats:
+        first, second = await asyncio.gather(read_page(), read_page())
+        await asyncio.gather(read_missing(), read_missing())
+    assert first is second
+    assert stats.count == 2
+    assert single_flight.stats.coalesced == 2
+
+    # a session with its own pending writes reads them back itself
+    db_session.add(BlogPostFactory.build())
+    first, second = await asyncio.gather(
+        read_page(),
+        BlogPostCrud(db_session).get_paginated_list(limit=10, offset=0),
+    )
+    assert (first.total, second.total) == (0, 1)
+    assert single_flight.stats.coalesced == 2
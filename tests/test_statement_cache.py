@@ -0,0 +1,53 @@
+import pytest
+from core.config import settings
+from db.crud.blog_post import BlogPostCrud
+from db.crud.statements import compiled_cache_stats, statement_cache_stats
+from httpx import AsyncClient
+from schemas.blog_post import UpdateBlogPostSchema
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from .factory.blog_post_factory import BlogPostFactory
+
+
+@pytest.mark.asyncio
+async def test_statements_are_built_once_per_class(db_session: AsyncSession):
+    posts = BlogPostFactory.build_batch(2)
+    db_session.add_all(posts)
+    await db_session.flush()
+
+    first, second = BlogPostCrud(db_session), BlogPostCrud(db_session)
+    assert first._get_by_id_statement(True) is second._get_by_id_statement(True)
+    assert first.out_schema_columns is second.out_schema_columns
+
+    stats = statement_cache_stats[BlogPostCrud.__qualname__]
+    misses = stats.misses
+    compiled_hits = compiled_cache_stats.hits
+    for post in posts:
+        assert (await first.get_by_id(post.id)).id == post.id
+    assert stats.misses == misses
+    # the second post reuses the compiled form of the first one's statement
+    assert compiled_cache_stats.hits > compiled_hits
+
+
+@pytest.mark.asyncio
+async def test_update_statements_are_keyed_by_fields(db_session: AsyncSession):
+    post = BlogPostFactory.build()
+    db_session.add(post)
+    await db_session.flush()
+    crud = BlogPostCrud(db_session)
+
+    updated = await crud.update_and_get_by_id(post.id, UpdateBlogPostSchema(title="a"))
+    assert (updated.title, updated.body) == ("a", post.body)
+    updated = await crud.update_and_get_by_id(post.id, UpdateBlogPostSchema(body="b"))
+    assert (updated.title, updated.body) == ("a", "b")
+
+
+@pytest.mark.asyncio
+async def test_statement_diagnostics(async_client: AsyncClient):
+    response = await async_client.get(
+        "/diagnostics/statements",
+        auth=(settings.DOCS_USERNAME, settings.DOCS_PASSWORD),
+    )
+    assert response.status_code == 200
+    assert {"hits", "misses", "uncached"} <= response.json()["compiled_cache"].keys()
+    assert BlogPostCrud.__qualname__ in response.json()["crud_statements"]
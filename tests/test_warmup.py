@@ -0,0 +1,84 @@
+import pytest
+from core.config import settings
+from db.crud.base import crud_classes
+from db.crud.blog_post import BlogPostCrud
+from db.crud.statements import compiled_cache_stats
+from db.pool import pool_status
+from db.session import engine
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+from warmup import (
+    asgi_get,
+    build_crud_statements,
+    fill_compiled_cache,
+    open_pool_connections,
+    warm_up,
+)
+
+from .factory.blog_post_factory import BlogPostFactory
+
+
+@pytest.mark.asyncio
+async def test_open_pool_connections():
+    await open_pool_connections(engine, 2)
+    status = pool_status(engine)
+    assert status["idle"] >= 2
+
+
+@pytest.mark.asyncio
+async def test_crud_statements_are_compiled_ahead(db_session: AsyncSession):
+    assert BlogPostCrud in set(crud_classes())
+    engine.sync_engine._compiled_cache.clear()
+    statements = build_crud_statements()
+    assert ("get_by_id", True) in BlogPostCrud._statements
+    await fill_compiled_cache(engine, statements)
+
+    post = BlogPostFactory.build()
+    db_session.add(post)
+    await db_session.flush()
+    misses = compiled_cache_stats.misses
+    crud = BlogPostCrud(db_session)
+    await crud.get_by_id(post.id)
+    await crud.get_paginated_list(5, 0)
+    await crud.get_paginated_list(5, 0, cursor="")
+    assert compiled_cache_stats.misses == misses
+
+
+@pytest.mark.asyncio
+async def test_asgi_get(app_):
+    assert await asgi_get(app_, "/health") == 200
+    assert await asgi_get(app_, "/v1/blog?limit=1") == 200
+    assert await asgi_get(app_, "/v1/blog?limit=0") == 422
+
+
+@pytest.mark.asyncio
+async def test_failing_warm_up_requests_do_not_stop_startup(monkeypatch):
+    app = FastAPI()
+    called = []
+
+    @app.get("/fails")
+    async def fails():
+        called.append("/fails")
+        raise RuntimeError("the database is not up yet")
+
+    @app.get("/works")
+    async def works():
+        called.append("/works")
+
+    monkeypatch.setattr(settings, "WARMUP_REQUESTS", ["/fails", "/works"])
+    monkeypatch.setattr(settings, "WARMUP_POOL_CONNECTIONS", 1)
+    await warm_up(app, engine, build_openapi=lambda: None)
+    assert called == ["/fails", "/works"]
+
+
+@pytest.mark.asyncio
+async def test_openapi_schema_is_cached(async_client: AsyncClient):
+    auth = (settings.DOCS_USERNAME, settings.DOCS_PASSWORD)
+    first = await async_client.get("/openapi.json", auth=auth)
+    assert first.status_code == 200
+    assert "/v1/blog" in first.json()["paths"]
+
+    from main import build_openapi
+
+    assert build_openapi.cache_info().currsize == 1